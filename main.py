@@ -3,45 +3,67 @@ IRIS Main Application Entry Point
 Intelligent Responsive Interface System
 """
 
-import asyncio
+import os
+import socket
 import uvicorn
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from src.api.server import create_app
-from src.core.iris import iris_core
+from src.api.server import create_app  # noqa: F401 - resolved by uvicorn via "main:create_app"
+from uvicorn.supervisors import ChangeReload, Multiprocess
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan manager"""
-    # Startup
-    print("🚀 Starting IRIS - Intelligent Responsive Interface System...")
-    await iris_core.initialize()
-    print("✅ IRIS is ready to assist!")
-    
-    yield
-    
-    # Shutdown
-    print("🔄 IRIS is shutting down gracefully...")
+# Listener tuning: buffers sized for bursty /ws traffic to high-latency clients
+SOCKET_BUFFER_SIZE = 256 * 1024
+LISTEN_BACKLOG = 2048
+
+def create_listen_socket(host: str, port: int, backlog: int = LISTEN_BACKLOG) -> socket.socket:
+    """Create a tuned TCP listening socket for uvicorn"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
 
 def main():
     """Main application entry point"""
-    # Create FastAPI app with lifespan
-    app = create_app()
-    app.router.lifespan_context = lifespan
-    
     # Start the server
     print("🌐 Starting IRIS web server on http://localhost:8000")
     print("📖 API Documentation available at http://localhost:8000/docs")
     print("🎤 Voice test interface at http://localhost:8000/voice_interface")
     
-    uvicorn.run(
+    # Production fans connections out across one worker per core; every worker
+    # keeps its own in-memory state (WebSocket sets, caches, conversation history)
+    production = os.getenv("ENVIRONMENT", "development") == "production"
+    workers = int(os.getenv("IRIS_WORKERS", os.cpu_count() or 1)) if production else 1
+    reload = os.getenv("IRIS_DEV") == "1"
+    
+    config = uvicorn.Config(
         "main:create_app",  # Import string format
         host="0.0.0.0", 
         port=8000, 
-        reload=True,
         log_level="info",
-        factory=True
+        factory=True,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=True,
+        ws_max_queue=16,  # Bound buffered inbound frames so slow handlers push back on the client
+        backlog=LISTEN_BACKLOG,
+        workers=workers,
+        reload=reload
     )
+    server = uvicorn.Server(config)
+    sock = create_listen_socket(config.host, config.port, config.backlog)
+    if config.should_reload:
+        ChangeReload(config, target=server.run, sockets=[sock]).run()
+    elif config.workers > 1:
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run(sockets=[sock])
 
 if __name__ == "__main__":
     main()
@@ -3,20 +3,262 @@ IRIS API Server
 FastAPI-based web server for the voice assistant
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+from pydantic import BaseModel
 from src.core.iris import iris_core
+from src.core.hybrid_intelligence import hybrid_ai
 import os
-import uvicorn
-from typing import List
-import json
+import httpx
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 import asyncio
+import re
+import time
+import msgspec
+import orjson
 
-from src.speech.tts import iris_tts, TTSEngine
+from src.speech.tts import iris_tts, AUDIO_MEDIA_TYPES, TTSEngine
 from src.speech.stt import iris_stt
 
+# Upper bound on one /ws message round-trip through IRIS core; slow providers fail fast
+PROCESS_TIMEOUT = 8.0
+
+# Error frame for failed /ws messages, serialized once and split around its placeholders
+_WS_ERROR_PARTS = re.split(rb"(__ERROR__|__USER_MESSAGE__)", orjson.dumps({
+    "type": "error",
+    "message": "🤖 I encountered an error: __ERROR__. Let me try to help anyway.",
+    "user_message": "__USER_MESSAGE__",
+    "iris_response": "I heard '__USER_MESSAGE__' but had trouble processing it. Please try again.",
+    "status": "error"
+}))
+
+def _ws_error_frame(error: str, user_message: str) -> bytes:
+    """Splice JSON-escaped values into the pre-serialized error frame"""
+    values = {
+        b"__ERROR__": orjson.dumps(error)[1:-1],
+        b"__USER_MESSAGE__": orjson.dumps(user_message)[1:-1]
+    }
+    return b"".join(values.get(part, part) for part in _WS_ERROR_PARTS)
+
+def _speech_fallback(error: str, text: str, language: str) -> Dict:
+    """Failed-synthesis reply telling the client to speak the text itself"""
+    return {
+        "success": False,
+        "error": error,
+        "fallback": {
+            "use_browser_synthesis": True,
+            "text": text,
+            "language": language
+        }
+    }
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that also sends a Cache-Control header"""
+
+    def __init__(self, *args, max_age: int = 86400, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+class AudioGZipResponder(GZipResponder):
+    """GZipResponder that sends audio responses as they are, unbuffered"""
+
+    passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Audio is already compressed, and gzip would hold back the first chunks of a stream
+            self.passthrough = Headers(raw=message["headers"]).get("content-type", "").startswith("audio/")
+        if self.passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
+
+class AudioGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves audio/* responses uncompressed"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = AudioGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+class TTLSnapshot:
+    """Caches the result of a zero-argument callable for a short TTL"""
+
+    def __init__(self, fetch: Callable[[], Any], ttl: float):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._value: Any = None
+        self._expires_at = 0.0
+
+    def get(self) -> Tuple[Any, bool]:
+        """Return (value, cache_hit), refreshing the value once it has expired"""
+        now = time.monotonic()
+        if now < self._expires_at:
+            return self._value, True
+        self._value = self.fetch()
+        self._expires_at = now + self.ttl
+        return self._value, False
+
+class ChatRequest(BaseModel):
+    """Request body for /chat"""
+    message: str = ""
+    user_id: str = "default"
+
+class SpeakRequest(BaseModel):
+    """Request body for /speak"""
+    text: str = ""
+    language: str = "en"
+    engine: str = "gtts"
+
+class VoiceCommandRequest(BaseModel):
+    """Request body for /process-voice"""
+    message: str = ""
+    language: str = "en"
+    user_id: str = "default"
+
+class StrategyRequest(BaseModel):
+    """Request body for /ai/strategy"""
+    strategy: str = "smart"
+
+class WSIncoming(msgspec.Struct):
+    """Inbound /ws client frame"""
+    message: str = ""
+    user_id: str = "default"
+    language: str = "en-US"
+
+class WSWriter:
+    """Coalescing WebSocket writer
+
+    Frames enqueued while a previous send is still in flight are joined
+    with newlines into a single binary frame (newline-delimited JSON).
+    A slow client keeps at most MAX_PENDING frames; the oldest are dropped.
+    """
+
+    MAX_BATCH_BYTES = 64 * 1024
+    MAX_PENDING = 16
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._pending: Deque[bytes] = deque(maxlen=self.MAX_PENDING)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of frames waiting to be sent"""
+        return len(self._pending)
+
+    def start(self):
+        """Start the background drain task"""
+        self._task = asyncio.create_task(self._drain())
+
+    def enqueue(self, payload: bytes):
+        """Queue a serialized JSON frame for sending"""
+        if len(self._pending) == self.MAX_PENDING:
+            self.dropped += 1
+        self._pending.append(payload)
+        self._ready.set()
+
+    async def close(self):
+        """Stop the drain task, dropping anything still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._pending.clear()
+
+    async def _drain(self):
+        """Send queued frames, batching up to MAX_BATCH_BYTES per send"""
+        pending = self._pending
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while pending:
+                    batch = [pending.popleft()]
+                    size = len(batch[0])
+                    while pending and size + len(pending[0]) <= self.MAX_BATCH_BYTES:
+                        frame = pending.popleft()
+                        batch.append(frame)
+                        size += len(frame)
+                    await self.websocket.send_bytes(batch[0] if len(batch) == 1 else b"\n".join(batch))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ WebSocket writer error: {e}")
+            pending.clear()
+
+# Constant bodies for the endpoints load balancers and pollers hit most
+_ROOT_BYTES = orjson.dumps({
+    "message": "🤖 IRIS Voice Assistant is running!",
+    "version": "0.1.0",
+    "status": "active",
+    "endpoints": {
+        "health": "/health",
+        "docs": "/docs",
+        "voice_interface": "/voice_interface",
+        "websocket": "/ws",
+        "chat": "/chat"
+    }
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "IRIS Voice Assistant",
+    "timestamp": "2025-07-27T13:00:00Z"
+})
+
+# Voice interface page, served from disk by StaticFiles
+VOICE_INTERFACE_DIR = Path(__file__).resolve().parent.parent / "ui" / "voice_interface"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    print("🚀 Starting IRIS - Intelligent Responsive Interface System...")
+    
+    # One pooled keep-alive client shared by TTS and the cloud AI providers
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+        timeout=10.0
+    )
+    iris_core.http_client = http_client
+    hybrid_ai.http_client = http_client
+    iris_tts.http_client = http_client
+    
+    await iris_core.initialize()
+    print("✅ IRIS is ready to assist!")
+    
+    yield
+    
+    # Shutdown
+    print("🔄 IRIS is shutting down gracefully...")
+    await iris_core.shutdown()
+    await iris_tts.shutdown()
+    await http_client.aclose()
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application"""
     
@@ -25,7 +267,9 @@ def create_app() -> FastAPI:
         description="Smart AI Voice Assistant API",
         version="0.1.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
     
     # Add CORS middleware
@@ -37,77 +281,86 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Store active WebSocket connections
-    active_connections: List[WebSocket] = []
+    # Compress HTML/JSON bodies; level 6 keeps most of the ratio at modest CPU cost
+    app.add_middleware(AudioGZipMiddleware, minimum_size=1024, compresslevel=6)
+    
+    # Store active WebSocket connections with their outbound writers
+    active_connections: Dict[WebSocket, WSWriter] = {}
+    ws_decoder = msgspec.json.Decoder(WSIncoming)
+    
+    # Status pollers hit these constantly; serve short-lived snapshots
+    provider_status = TTLSnapshot(hybrid_ai.get_provider_status, ttl=5.0)
+    tts_languages = TTLSnapshot(iris_tts.get_supported_languages, ttl=300.0)
     
     @app.get("/")
     async def root():
         """Root endpoint - health check"""
-        return {
-            "message": "🤖 IRIS Voice Assistant is running!",
-            "version": "0.1.0",
-            "status": "active",
-            "endpoints": {
-                "health": "/health",
-                "docs": "/docs",
-                "voice_interface": "/voice_interface",
-                "websocket": "/ws",
-                "chat": "/chat"
-            }
-        }
+        return Response(_ROOT_BYTES, media_type="application/json")
     
     @app.get("/health")
     async def health_check():
         """Health check endpoint"""
-        return {
-            "status": "healthy",
-            "service": "IRIS Voice Assistant",
-            "timestamp": "2025-07-27T13:00:00Z"
-        }
+        return Response(_HEALTH_BYTES, media_type="application/json")
     
     @app.post("/chat")
-    async def chat_endpoint(message: dict):
+    async def chat_endpoint(body: ChatRequest):
         """Enhanced chat endpoint with IRIS intelligence"""
-        user_message = message.get("message", "")
-        user_id = message.get("user_id", "default")
+        user_message = body.message
+        user_id = body.user_id
 
         # Process message through IRIS core
         result = await iris_core.process_message(user_message, user_id)
     
-        return {
+        return ORJSONResponse(content={
             "user_message": user_message,
             "iris_response": result["response"],
             "confidence": result["confidence"],
             "intent": result["intent"],
             "timestamp": result["timestamp"],
             "status": "success"
-        }
+        })
     
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
         """WebSocket endpoint for real-time communication with hybrid AI"""
         await websocket.accept()
-        active_connections.append(websocket)
+        print(f"📱 Client connected to IRIS (extensions offered: {websocket.headers.get('sec-websocket-extensions', 'none')})")
+        writer = WSWriter(websocket)
+        writer.start()
+        active_connections[websocket] = writer
 
         try:
-            await websocket.send_text(json.dumps({
+            writer.enqueue(orjson.dumps({
                 "type": "connection",
                 "message": "🤖 Connected to IRIS! I'm powered by hybrid AI and ready to assist.",
                 "status": "connected"
             }))
 
             while True:
-                # Wait for message from client
-                data = await websocket.receive_text()
-                message_data = json.loads(data)
-                user_message = message_data.get("message", "")
-                user_id = message_data.get("user_id", "default")
-                language = message_data.get("language", "en-US")
+                # Wait for message from client (binary frames, with text fallback)
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                try:
+                    incoming = ws_decoder.decode(frame.get("bytes") or frame.get("text") or b"")
+                except msgspec.MsgspecError as e:
+                    writer.enqueue(orjson.dumps({
+                        "type": "error",
+                        "message": f"🤖 I couldn't read that message: {e}",
+                        "status": "error"
+                    }))
+                    continue
+                user_message = incoming.message
+                user_id = incoming.user_id
+                language = incoming.language
 
                 if user_message:
                     try:
                         # Process through IRIS hybrid AI system (NOT the old echo logic)
-                        ai_result = await iris_core.process_message(user_message, user_id)
+                        ai_result = await asyncio.wait_for(
+                            iris_core.process_message(user_message, user_id),
+                            timeout=PROCESS_TIMEOUT
+                        )
 
                         # Send AI response back via WebSocket
                         response = {
@@ -122,464 +375,35 @@ def create_app() -> FastAPI:
                             "timestamp": ai_result["timestamp"]
                         }
 
-                        await websocket.send_text(json.dumps(response))
+                        writer.enqueue(orjson.dumps(response))
 
+                    except asyncio.TimeoutError:
+                        writer.enqueue(_ws_error_frame(f"no response within {PROCESS_TIMEOUT:g}s", user_message))
                     except Exception as e:
                         # Send error response
-                        error_response = {
-                            "type": "error",
-                            "message": f"🤖 I encountered an error: {str(e)}. Let me try to help anyway.",
-                            "user_message": user_message,
-                            "iris_response": f"I heard '{user_message}' but had trouble processing it. Please try again.",
-                            "status": "error"
-                        }
-                        await websocket.send_text(json.dumps(error_response))
+                        writer.enqueue(_ws_error_frame(str(e), user_message))
 
         except WebSocketDisconnect:
-            active_connections.remove(websocket)
             print("📱 Client disconnected from IRIS")
         except Exception as e:
             print(f"❌ WebSocket error: {e}")
-            if websocket in active_connections:
-                active_connections.remove(websocket)
-
-    @app.get("/voice-interface")
-    async def voice_interface():
-        """Advanced voice interface with real Web Speech API"""
-        return HTMLResponse("""
-            <!DOCTYPE html>
-            <html>
-            <head>
-            <title>IRIS Advanced Voice Interface</title>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        .container {
-            max-width: 800px;
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border-radius: 20px;
-            padding: 40px;
-            text-align: center;
-            box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-            border: 1px solid rgba(255, 255, 255, 0.18);
-        }
-        .iris-logo {
-            font-size: 72px;
-            margin-bottom: 20px;
-            animation: pulse 2s infinite;
-        }
-        @keyframes pulse {
-            0%, 100% { transform: scale(1); }
-            50% { transform: scale(1.1); }
-        }
-        h1 { margin-bottom: 10px; font-size: 2.5em; }
-        .subtitle { opacity: 0.8; margin-bottom: 30px; font-size: 1.2em; }
-        .controls {
-            display: flex;
-            gap: 20px;
-            justify-content: center;
-            margin: 30px 0;
-            flex-wrap: wrap;
-        }
-        button {
-            padding: 15px 30px;
-            font-size: 16px;
-            border: none;
-            border-radius: 50px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-weight: 600;
-            min-width: 150px;
-        }
-        .primary-btn {
-            background: linear-gradient(45deg, #4CAF50, #45a049);
-            color: white;
-        }
-        .secondary-btn {
-            background: linear-gradient(45deg, #2196F3, #1976D2);
-            color: white;
-        }
-        .danger-btn {
-            background: linear-gradient(45deg, #f44336, #d32f2f);
-            color: white;
-        }
-        button:hover { transform: translateY(-2px); box-shadow: 0 5px 15px rgba(0,0,0,0.3); }
-        button:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-        .status {
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 10px;
-            background: rgba(255, 255, 255, 0.1);
-            border-left: 4px solid #4CAF50;
-        }
-        .conversation {
-            text-align: left;
-            max-height: 400px;
-            overflow-y: auto;
-            padding: 20px;
-            background: rgba(0, 0, 0, 0.2);
-            border-radius: 10px;
-            margin-top: 20px;
-        }
-        .message {
-            margin: 10px 0;
-            padding: 10px 15px;
-            border-radius: 15px;
-            max-width: 80%;
-        }
-        .user-message {
-            background: rgba(76, 175, 80, 0.3);
-            margin-left: auto;
-            text-align: right;
-        }
-        .iris-message {
-            background: rgba(33, 150, 243, 0.3);
-            margin-right: auto;
-        }
-        .settings {
-            display: flex;
-            gap: 20px;
-            justify-content: center;
-            margin: 20px 0;
-            flex-wrap: wrap;
-        }
-        select {
-            padding: 10px;
-            border: none;
-            border-radius: 5px;
-            background: rgba(255, 255, 255, 0.2);
-            color: white;
-            font-size: 14px;
-        }
-        select option { background: #333; color: white; }
-        .visualizer {
-            height: 60px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 10px;
-            margin: 20px 0;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            position: relative;
-        }
-        .wave {
-            width: 4px;
-            height: 20px;
-            background: #4CAF50;
-            margin: 0 2px;
-            border-radius: 2px;
-            animation: wave 1s infinite ease-in-out;
-        }
-        .wave:nth-child(2) { animation-delay: 0.1s; }
-        .wave:nth-child(3) { animation-delay: 0.2s; }
-        .wave:nth-child(4) { animation-delay: 0.3s; }
-        .wave:nth-child(5) { animation-delay: 0.4s; }
-        @keyframes wave {
-            0%, 100% { height: 20px; }
-            50% { height: 40px; }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="iris-logo">🤖</div>
-        <h1>IRIS Voice Interface</h1>
-        <p class="subtitle">Advanced Speech Recognition & AI Assistant</p>
-        
-        <div class="settings">
-            <select id="languageSelect">
-                <option value="en-US">English (US)</option>
-                <option value="en-GB">English (UK)</option>
-                <option value="es-ES">Spanish</option>
-                <option value="fr-FR">French</option>
-                <option value="de-DE">German</option>
-                <option value="hi-IN">Hindi</option>
-            </select>
-            <select id="voiceSelect">
-                <option value="female">Female Voice</option>
-                <option value="male">Male Voice</option>
-            </select>
-        </div>
-        
-        <div class="controls">
-            <button id="startBtn" class="primary-btn">🎤 Start Listening</button>
-            <button id="stopBtn" class="danger-btn" disabled>⏹️ Stop Listening</button>
-            <button id="connectBtn" class="secondary-btn">🔗 Connect to IRIS</button>
-        </div>
-        
-        <div id="visualizer" class="visualizer" style="display: none;">
-            <div class="wave"></div>
-            <div class="wave"></div>
-            <div class="wave"></div>
-            <div class="wave"></div>
-            <div class="wave"></div>
-        </div>
-        
-        <div id="status" class="status">
-            <strong>Status:</strong> <span id="statusText">Ready to start</span>
-        </div>
-        
-        <div id="conversation" class="conversation">
-            <div class="message iris-message">
-                <strong>🤖 IRIS:</strong> Welcome! I'm ready to listen and respond to your voice commands.
-            </div>
-        </div>
-    </div>
-
-    <script>
-        // Web Speech API Implementation
-        class IRISVoiceInterface {
-            constructor() {
-                this.recognition = null;
-                this.synthesis = window.speechSynthesis;
-                this.isListening = false;
-                this.ws = null;
-                this.currentLanguage = 'en-US';
-                this.currentVoice = 'female';
-                
-                this.initializeElements();
-                this.setupEventListeners();
-                this.checkSpeechSupport();
-            }
-            
-            initializeElements() {
-                this.startBtn = document.getElementById('startBtn');
-                this.stopBtn = document.getElementById('stopBtn');
-                this.connectBtn = document.getElementById('connectBtn');
-                this.statusText = document.getElementById('statusText');
-                this.conversation = document.getElementById('conversation');
-                this.visualizer = document.getElementById('visualizer');
-                this.languageSelect = document.getElementById('languageSelect');
-                this.voiceSelect = document.getElementById('voiceSelect');
-            }
-            
-            setupEventListeners() {
-                this.startBtn.onclick = () => this.startListening();
-                this.stopBtn.onclick = () => this.stopListening();
-                this.connectBtn.onclick = () => this.connectWebSocket();
-                this.languageSelect.onchange = (e) => this.changeLanguage(e.target.value);
-                this.voiceSelect.onchange = (e) => this.changeVoice(e.target.value);
-            }
-            
-            checkSpeechSupport() {
-                if (!('webkitSpeechRecognition' in window) && !('SpeechRecognition' in window)) {
-                    this.updateStatus('❌ Speech recognition not supported in this browser');
-                    this.startBtn.disabled = true;
-                    return false;
-                }
-                
-                const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
-                this.recognition = new SpeechRecognition();
-                this.setupSpeechRecognition();
-                return true;
-            }
-            
-            setupSpeechRecognition() {
-                this.recognition.continuous = true;
-                this.recognition.interimResults = true;
-                this.recognition.lang = this.currentLanguage;
-                
-                this.recognition.onstart = () => {
-                    this.isListening = true;
-                    this.updateStatus('🎤 Listening...');
-                    this.visualizer.style.display = 'flex';
-                    this.startBtn.disabled = true;
-                    this.stopBtn.disabled = false;
-                };
-                
-                this.recognition.onresult = (event) => {
-                    let finalTranscript = '';
-                    let interimTranscript = '';
-                    
-                    for (let i = event.resultIndex; i < event.results.length; i++) {
-                        const transcript = event.results[i][0].transcript;
-                        if (event.results[i].isFinal) {
-                            finalTranscript += transcript;
-                        } else {
-                            interimTranscript += transcript;
-                        }
-                    }
-                    
-                    if (finalTranscript) {
-                        this.handleSpeechResult(finalTranscript, event.results[event.resultIndex][0].confidence);
-                    }
-                    
-                    // Show interim results
-                    if (interimTranscript) {
-                        this.updateStatus(`🎤 Hearing: "${interimTranscript}"`);
-                    }
-                };
-                
-                this.recognition.onerror = (event) => {
-                    this.updateStatus(`❌ Speech recognition error: ${event.error}`);
-                    this.stopListening();
-                };
-                
-                this.recognition.onend = () => {
-                    if (this.isListening) {
-                        // Restart recognition if it was stopped unexpectedly
-                        setTimeout(() => this.recognition.start(), 100);
-                    }
-                };
-            }
-            
-            async handleSpeechResult(transcript, confidence) {
-                this.addMessage(transcript, 'user');
-                this.updateStatus(`✅ Heard: "${transcript}" (${Math.round(confidence * 100)}% confidence)`);
-                
-                // Send to IRIS via WebSocket
-                if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-                    this.ws.send(JSON.stringify({
-                        message: transcript,
-                        confidence: confidence,
-                        language: this.currentLanguage
-                    }));
-                } else {
-                    // Fallback to REST API
-                    try {
-                        const response = await fetch('/chat', {
-                            method: 'POST',
-                            headers: {'Content-Type': 'application/json'},
-                            body: JSON.stringify({message: transcript})
-                        });
-                        const data = await response.json();
-                        this.handleIRISResponse(data.iris_response);
-                    } catch (error) {
-                        this.addMessage('❌ Connection error. Please try connecting to IRIS.', 'iris');
-                    }
-                }
-            }
-            
-            handleIRISResponse(response) {
-                this.addMessage(response, 'iris');
-                this.speakResponse(response);
-            }
-            
-            speakResponse(text) {
-                // Cancel any ongoing speech
-                this.synthesis.cancel();
-                
-                const utterance = new SpeechSynthesisUtterance(text);
-                utterance.lang = this.currentLanguage;
-                utterance.rate = 0.9;
-                utterance.pitch = this.currentVoice === 'female' ? 1.2 : 0.8;
-                
-                // Select appropriate voice
-                const voices = this.synthesis.getVoices();
-                const targetVoice = voices.find(voice => 
-                    voice.lang.startsWith(this.currentLanguage.split('-')[0]) &&
-                    voice.name.toLowerCase().includes(this.currentVoice)
-                ) || voices.find(voice => voice.lang.startsWith(this.currentLanguage.split('-')[0]));
-                
-                if (targetVoice) utterance.voice = targetVoice;
-                
-                utterance.onstart = () => this.updateStatus('🔊 IRIS is speaking...');
-                utterance.onend = () => this.updateStatus('🎤 Ready for your next command');
-                
-                this.synthesis.speak(utterance);
-            }
-            
-            startListening() {
-                if (this.recognition) {
-                    this.recognition.start();
-                }
-            }
-            
-            stopListening() {
-                this.isListening = false;
-                if (this.recognition) {
-                    this.recognition.stop();
-                }
-                this.visualizer.style.display = 'none';
-                this.startBtn.disabled = false;
-                this.stopBtn.disabled = true;
-                this.updateStatus('⏹️ Stopped listening');
-            }
-            
-            connectWebSocket() {
-                this.ws = new WebSocket('ws://localhost:8000/ws');
-                
-                this.ws.onopen = () => {
-                    this.updateStatus('✅ Connected to IRIS WebSocket');
-                    this.connectBtn.textContent = '✅ Connected';
-                    this.connectBtn.disabled = true;
-                };
-                
-                this.ws.onmessage = (event) => {
-                    const data = JSON.parse(event.data);
-                    if (data.iris_response) {
-                        this.handleIRISResponse(data.iris_response);
-                    }
-                };
-                
-                this.ws.onclose = () => {
-                    this.updateStatus('❌ Disconnected from IRIS');
-                    this.connectBtn.textContent = '🔗 Connect to IRIS';
-                    this.connectBtn.disabled = false;
-                };
-                
-                this.ws.onerror = (error) => {
-                    this.updateStatus('❌ WebSocket error');
-                    console.error('WebSocket error:', error);
-                };
-            }
-            
-            changeLanguage(language) {
-                this.currentLanguage = language;
-                if (this.recognition) {
-                    this.recognition.lang = language;
-                }
-                this.updateStatus(`🌐 Language changed to ${language}`);
-            }
-            
-            changeVoice(voice) {
-                this.currentVoice = voice;
-                this.updateStatus(`🎵 Voice changed to ${voice}`);
-            }
-            
-            addMessage(message, sender) {
-                const messageDiv = document.createElement('div');
-                messageDiv.className = `message ${sender}-message`;
-                messageDiv.innerHTML = `<strong>${sender === 'user' ? '👤 You' : '🤖 IRIS'}:</strong> ${message}`;
-                this.conversation.appendChild(messageDiv);
-                this.conversation.scrollTop = this.conversation.scrollHeight;
-            }
-            
-            updateStatus(status) {
-                this.statusText.textContent = status;
-            }
-        }
-        
-        // Initialize the voice interface when page loads
-        document.addEventListener('DOMContentLoaded', () => {
-            new IRISVoiceInterface();
-        });
-    </script>
-</body>
-</html>
-    """)
+        finally:
+            active_connections.pop(websocket, None)
+            await writer.close()
+
+    # Advanced voice interface with real Web Speech API
+    app.mount(
+        "/voice-interface",
+        CachedStaticFiles(directory=VOICE_INTERFACE_DIR, html=True),
+        name="voice_interface"
+    )
 
     @app.post("/speak")
-    async def speak_endpoint(request: dict):
+    async def speak_endpoint(body: SpeakRequest, request: Request):
         """Convert text to speech"""
-        text = request.get("text", "")
-        language = request.get("language", "en")
-        engine = request.get("engine", "gtts")
+        text = body.text
+        language = body.language
+        engine = body.engine
     
         if not text:
             return {"error": "No text provided"}
@@ -594,30 +418,70 @@ def create_app() -> FastAPI:
                 iris_tts.engine = TTSEngine.GTTS
         
             result = await iris_tts.speak(text, language)
-            return result
+            
+            # Binary-capable clients get the raw clip: no base64 inflation or encode cost
+            accept = request.headers.get("accept", "")
+            if "audio_bytes" in result and ("audio/" in accept or "application/octet-stream" in accept):
+                return Response(
+                    content=result["audio_bytes"],
+                    media_type=AUDIO_MEDIA_TYPES[result["audio_format"]],
+                    headers={
+                        "X-TTS-Engine": result["engine"],
+                        "X-TTS-Duration-Estimate": f"{result['duration_estimate']:.3f}"
+                    }
+                )
+            return result.for_json()
         
         except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "fallback": {
-                    "use_browser_synthesis": True,
-                    "text": text,
-                    "language": language
-                }
-            }
+            return _speech_fallback(str(e), text, language)
+
+    @app.post("/speak/stream")
+    async def speak_stream_endpoint(body: SpeakRequest):
+        """Stream synthesized audio as it is produced"""
+        text = body.text
+        language = body.language
+    
+        if not text:
+            return {"error": "No text provided"}
+    
+        try:
+            engine = TTSEngine(body.engine)
+        except ValueError:
+            engine = TTSEngine.GTTS
+        
+        media_type = iris_tts.stream_media_type(engine)
+        if media_type is None:
+            return _speech_fallback(f"{engine.value} cannot stream audio", text, language)
+        
+        # Pull the first chunk before committing to a 200: failures here still get the JSON fallback
+        stream = iris_tts.speak_stream(text, language, engine)
+        try:
+            first = await anext(stream)
+        except StopAsyncIteration:
+            return _speech_fallback(f"{engine.value} produced no audio", text, language)
+        except Exception as e:
+            await stream.aclose()
+            return _speech_fallback(str(e), text, language)
+        
+        async def body_stream():
+            yield first
+            async for chunk in stream:
+                yield chunk
+        
+        # AudioGZipMiddleware passes audio/* through, so each chunk goes out as soon as it is synthesized
+        return StreamingResponse(body_stream(), media_type=media_type)
 
     @app.get("/tts/languages")
     async def get_tts_languages():
         """Get supported TTS languages"""
-        return iris_tts.get_supported_languages()
+        return tts_languages.get()[0]
 
     @app.post("/process-voice")
-    async def process_voice_command(request: dict):
+    async def process_voice_command(body: VoiceCommandRequest):
         """Process voice command end-to-end (STT -> AI -> TTS)"""
-        message = request.get("message", "")
-        language = request.get("language", "en")
-        user_id = request.get("user_id", "default")
+        message = body.message
+        language = body.language
+        user_id = body.user_id
     
         try:
             # Process through IRIS AI
@@ -626,15 +490,15 @@ def create_app() -> FastAPI:
             # Generate speech response
             tts_result = await iris_tts.speak(ai_result["response"], language)
 
-            return {
+            return ORJSONResponse(content={
                 "user_message": message,
                 "iris_response": ai_result["response"],
-                "audio_data": tts_result,
+                "audio_data": tts_result.for_json(),
                 "confidence": ai_result["confidence"],
                 "intent": ai_result["intent"],
                 "timestamp": ai_result["timestamp"],
                 "status": "success"
-            }
+            })
         
         except Exception as e:
             return {
@@ -645,12 +509,12 @@ def create_app() -> FastAPI:
     @app.get("/ai/providers")
     async def get_ai_providers():
         """Get status of all AI providers"""
-        return hybrid_ai.get_provider_status()
+        return provider_status.get()[0]
 
     @app.post("/ai/strategy")
-    async def set_ai_strategy(request: dict):
+    async def set_ai_strategy(body: StrategyRequest):
         """Change AI routing strategy"""
-        strategy = request.get("strategy", "smart")
+        strategy = body.strategy
 
         try:
             hybrid_ai.set_routing_strategy(strategy)
@@ -668,17 +532,23 @@ def create_app() -> FastAPI:
     @app.get("/system/status")
     async def system_status():
         """Get complete system status"""
+        providers, providers_cached = provider_status.get()
+        languages, languages_cached = tts_languages.get()
         return {
             "iris_core": "operational",
-            "hybrid_ai": hybrid_ai.get_provider_status(),
-            "tts_engines": iris_tts.get_supported_languages(),
+            "hybrid_ai": providers,
+            "tts_engines": languages,
             "stt_status": "web_speech_api_ready",
+            "response_cache": hybrid_ai.get_cache_stats(),
+            "websockets": {
+                "active_connections": len(active_connections),
+                "pending_frames": sum(w.pending for w in active_connections.values()),
+                "dropped_frames": sum(w.dropped for w in active_connections.values()),
+                "max_pending_per_connection": WSWriter.MAX_PENDING
+            },
+            "cache_hit": {"hybrid_ai": providers_cached, "tts_engines": languages_cached},
             "uptime": "connected",
             "version": "0.1.0"
         }
     
     return app
-
-if __name__ == "__main__":
-    app = create_app()
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
@@ -4,10 +4,17 @@ Combines local and cloud AI services with smart routing
 """
 
 import asyncio
+import bisect
+import os
 import time
-from typing import Dict, List, Optional, Union
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
-import random
+from functools import partial
+from operator import attrgetter, itemgetter
+import httpx
+from src.core.intents import match_hindi_greeting, match_intents
 
 class AIProvider(Enum):
     OLLAMA_LOCAL = "ollama_local"
@@ -16,246 +23,561 @@ class AIProvider(Enum):
     OPENAI_CLOUD = "openai_cloud"
     FALLBACK_LOCAL = "fallback_local"
 
+# Enum values and locality, resolved once instead of per request
+_PROVIDER_VALUE = {p: p.value for p in AIProvider}
+_PROVIDER_IS_LOCAL = {p: "local" in p.value.lower() for p in AIProvider}
+
 class ProviderStatus(Enum):
     AVAILABLE = "available"
     UNAVAILABLE = "unavailable"
     RATE_LIMITED = "rate_limited"
     ERROR = "error"
 
+@dataclass(slots=True)
+class RateLimit:
+    """Token bucket holding up to capacity requests, refilled evenly over window"""
+    capacity: int
+    window: float  # Seconds
+    tokens: float = field(init=False)
+    refill_per_sec: float = field(init=False)
+    last_refill: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        self.tokens = float(self.capacity)
+        self.refill_per_sec = self.capacity / self.window
+
+@dataclass(slots=True)
+class ProviderInfo:
+    """Static traits and live health of one AI provider"""
+    status: ProviderStatus
+    priority: int
+    cost: float
+    latency: float
+    quality: float
+    last_used: float = 0
+    rate_limit: Optional[RateLimit] = None
+    error_count: int = 0
+    is_local: bool = False
+    consecutive_failures: int = 0
+    disabled_until: float = 0  # Monotonic time the circuit breaker reopens for a probe
+    probe_in_flight: bool = False  # Half-open: the one admitted probe hasn't reported yet
+    slow_streak: int = 0
+
+_CAPABILITIES_RESPONSE = (
+    "I'm IRIS, your intelligent voice assistant! Here's what I can do for you:\n\n"
+    "🎤 Voice Interaction: Natural speech recognition in multiple languages\n"
+    "🧠 AI Intelligence: Powered by a hybrid local/cloud AI for optimal performance\n"
+    "🌐 Web Integration: Search the web and gather information\n"
+    "📅 Task Management: Assist with scheduling, reminders, and organization\n"
+    "📂 File Processing: Read and analyze documents, PDFs, and text files\n"
+    "🗣️ Multi-language Support: Communicate fluently in English, Hindi, and more\n"
+    "🔒 Privacy-First: Prioritize local processing to keep your data secure\n\n"
+    "Just speak naturally, and I'll understand exactly what you need!"
+)
+
+# Hindi replies keyed by the greeting that matched
+_HINDI_RESPONSES = {
+    "नमस्ते": "नमस्ते! मैं IRIS हूं, आपका बुद्धिमान सहायक। मैं आपकी कैसे मदद कर सकता हूं?",
+    "हेलो": "हैलो! मैं IRIS हूं। आपका स्वागत है!"
+}
+
+_GREETING_RESPONSE = "Hello! I'm IRIS, powered by advanced AI. How can I assist you today?"
+_ACKNOWLEDGE_RESPONSE = "Great! Is there anything specific you'd like me to help you with? I'm here and ready to assist!"
+_WEATHER_RESPONSE = "I can help with weather information. Weather integration is being enhanced with multiple data sources."
+_TIME_FORMAT = "The current time is %H:%M:%S on %Y-%m-%d. I'm running in hybrid mode for optimal performance."
+
+# (intent, reply, cacheable) entries; the first intent present in a message wins.
+# Replies are constant strings, or zero-argument callables for live values.
+_CONTEXTUAL_RESPONSES: Tuple[Tuple[str, Union[str, Callable[[], str]], bool], ...] = (
+    ("greeting", _GREETING_RESPONSE, True),
+    ("help", _CAPABILITIES_RESPONSE, True),
+    ("acknowledge", _ACKNOWLEDGE_RESPONSE, True),
+    ("weather", _WEATHER_RESPONSE, True),
+    ("time", partial(time.strftime, _TIME_FORMAT), False),
+)
+
+# Fallback replies, rotated in order (four entries so the index is a bit mask)
+_FALLBACK_TEMPLATES = (
+    "I understand you're asking about '{message}'. Let me help you with that.",
+    "That's an interesting question about '{message}'. Here's what I think...",
+    "Regarding '{message}', I can provide some insights.",
+    "I see you mentioned '{message}'. Let me assist you."
+)
+
+# Message-length buckets for smart routing: [0, 64), [64, 256), [256, 1024), [1024, inf)
+_BUCKET_BOUNDS = (64, 256, 1024)
+
+# Per-bucket (latency, quality, cost) weights: short prompts take the fastest free
+# provider, mid-length ones stay local, long ones (the old > 500 chars rule) go to
+# the highest-quality provider
+_BUCKET_WEIGHTS = ((1.0, 0.4, 200.0), (0.1, 0.4, 10.0), (0.1, 2.0, 10.0), (0.05, 6.0, 10.0))
+
+# Sort key and direction for each fixed routing strategy
+_STRATEGY_KEYS = {
+    "cost_first": (attrgetter("cost"), False),
+    "speed_first": (attrgetter("latency"), False),
+    "quality_first": (attrgetter("quality"), True),
+    "priority": (attrgetter("priority"), False)
+}
+
+def _rank(keys, providers, reverse: bool = False) -> tuple:
+    """Order providers by precomputed keys; the sort is stable, so declaration order breaks ties"""
+    return tuple(map(itemgetter(1), sorted(zip(keys, providers), key=itemgetter(0), reverse=reverse)))
+
+# Degraded or already-replayed answers that must not be cached
+UNCACHEABLE_PROVIDERS = frozenset({_PROVIDER_VALUE[AIProvider.FALLBACK_LOCAL], "emergency_fallback", "cache"})
+
+def _cache_message_key(message: str) -> Optional[str]:
+    """Cache key for a message's answer, or None when the answer is too live to cache.
+
+    Intent replies don't depend on the user's wording and share a case-folded key;
+    the general reply echoes the message back, so it is keyed on the exact text.
+    """
+    stripped = message.strip()
+    normalized = stripped.lower()
+    if match_hindi_greeting(normalized) is not None:
+        return normalized
+    matched = match_intents(normalized)
+    if matched:
+        for intent, _, cacheable in _CONTEXTUAL_RESPONSES:
+            if intent in matched:
+                return normalized if cacheable else None
+    return stripped
+
+def is_cacheable_result(result: Dict) -> bool:
+    """Whether an answer came from the routed provider and may be replayed"""
+    return result.get("status") == "success" and not result.get("fallback_used") \
+        and result.get("provider_used") not in UNCACHEABLE_PROVIDERS
+
 class HybridIntelligenceManager:
     """Manages multiple AI providers with intelligent routing"""
     
-    def __init__(self):
-        self.providers = {
-            AIProvider.OLLAMA_LOCAL: {
-                "status": ProviderStatus.AVAILABLE,
-                "priority": 1,  # Highest priority (local, free, private)
-                "cost": 0,
-                "latency": 2.0,
-                "quality": 0.85,
-                "last_used": 0,
-                "rate_limit": None,
-                "error_count": 0
-            },
-            AIProvider.HUGGINGFACE_LOCAL: {
-                "status": ProviderStatus.AVAILABLE,
-                "priority": 2,
-                "cost": 0,
-                "latency": 3.0,
-                "quality": 0.80,
-                "last_used": 0,
-                "rate_limit": None,
-                "error_count": 0
-            },
-            AIProvider.HUGGINGFACE_CLOUD: {
-                "status": ProviderStatus.AVAILABLE,
-                "priority": 3,
-                "cost": 0,  # Free tier
-                "latency": 1.5,
-                "quality": 0.88,
-                "last_used": 0,
-                "rate_limit": {"max_requests": 1000, "per_hour": 1, "current": 0},
-                "error_count": 0
-            },
-            AIProvider.OPENAI_CLOUD: {
-                "status": ProviderStatus.AVAILABLE,
-                "priority": 4,
-                "cost": 0.002,  # Per 1K tokens
-                "latency": 1.2,
-                "quality": 0.95,
-                "last_used": 0,
-                "rate_limit": {"max_requests": 60, "per_minute": 1, "current": 0},
-                "error_count": 0
-            },
-            AIProvider.FALLBACK_LOCAL: {
-                "status": ProviderStatus.AVAILABLE,
-                "priority": 5,  # Last resort
-                "cost": 0,
-                "latency": 0.1,
-                "quality": 0.50,
-                "last_used": 0,
-                "rate_limit": None,
-                "error_count": 0
-            }
+    # Circuit breaker: trip after this many consecutive failures, back off
+    # min(MAX_BACKOFF, 2**failures) seconds, then let one probe through
+    FAILURE_THRESHOLD = 3
+    MAX_BACKOFF = 60.0
+    # Calls slower than SLOW_FACTOR x declared latency, SLOW_STREAK_LIMIT times in a row, count as a failure
+    SLOW_FACTOR = 3.0
+    SLOW_STREAK_LIMIT = 3
+    
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 300.0,
+                 max_batch_size: int = 16, batch_timeout: float = 0.02,
+                 simulate_latency: Optional[bool] = None):
+        self.providers: Dict[AIProvider, ProviderInfo] = {
+            AIProvider.OLLAMA_LOCAL: ProviderInfo(
+                status=ProviderStatus.AVAILABLE,
+                priority=1,  # Highest priority (local, free, private)
+                cost=0,
+                latency=2.0,
+                quality=0.85
+            ),
+            AIProvider.HUGGINGFACE_LOCAL: ProviderInfo(
+                status=ProviderStatus.AVAILABLE,
+                priority=2,
+                cost=0,
+                latency=3.0,
+                quality=0.80
+            ),
+            AIProvider.HUGGINGFACE_CLOUD: ProviderInfo(
+                status=ProviderStatus.AVAILABLE,
+                priority=3,
+                cost=0,  # Free tier
+                latency=1.5,
+                quality=0.88,
+                rate_limit=RateLimit(capacity=1000, window=3600)  # Per hour
+            ),
+            AIProvider.OPENAI_CLOUD: ProviderInfo(
+                status=ProviderStatus.AVAILABLE,
+                priority=4,
+                cost=0.002,  # Per 1K tokens
+                latency=1.2,
+                quality=0.95,
+                rate_limit=RateLimit(capacity=60, window=60)  # Per minute
+            ),
+            AIProvider.FALLBACK_LOCAL: ProviderInfo(
+                status=ProviderStatus.AVAILABLE,
+                priority=5,  # Last resort
+                cost=0,
+                latency=0.1,
+                quality=0.50
+            )
         }
         
+        for provider, info in self.providers.items():
+            info.is_local = _PROVIDER_IS_LOCAL[provider]
+        
         self.routing_strategy = "smart"  # smart, cost_first, speed_first, quality_first
         self.fallback_enabled = True
+        self._fallback_counter = 0
+        
+        # Simulated provider latency; IRIS_SIMULATE_LATENCY=0 turns it off for tests/benchmarks
+        if simulate_latency is None:
+            simulate_latency = os.getenv("IRIS_SIMULATE_LATENCY", "1") != "0"
+        self.simulate_latency = simulate_latency
+        
+        # Model providers, each answering a batch of contextual texts in one call
+        self._dispatch: Dict[AIProvider, Callable[[List[str]], Awaitable[List[Dict]]]] = {
+            AIProvider.OLLAMA_LOCAL: self._ollama_process,
+            AIProvider.HUGGINGFACE_LOCAL: self._huggingface_local_process,
+            AIProvider.HUGGINGFACE_CLOUD: self._huggingface_cloud_process,
+            AIProvider.OPENAI_CLOUD: self._openai_process
+        }
+        self.http_client: Optional[httpx.AsyncClient] = None  # Shared pooled client for cloud providers
         
-    async def process_request(self, message: str, user_id: str, context: Dict = None) -> Dict:
+        # Provider order per strategy (and per length bucket for smart); rebuilt only when error_count/status change
+        self._strategy_order: Dict[str, Tuple[AIProvider, ...]] = {}
+        self._bucket_order: Tuple[Tuple[AIProvider, ...], ...] = ()
+        self._rebuild_strategy_order()
+        
+        # Response cache keyed by (user_id, message key, strategy) -> (expires_at, result)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._resp_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Micro-batcher: requests queue up briefly and each provider answers its share in one call
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout
+        self._batch_pending: Deque[Tuple] = deque()
+        self._batch_ready = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._batch_tasks: Dict[asyncio.Task, List[Tuple]] = {}  # Dispatched batch -> its queued items
+        self._batcher_task: Optional[asyncio.Task] = None
+        
+        # Write-behind provider stats, applied by a background consumer
+        self._stats_queue: asyncio.Queue = asyncio.Queue()
+        self._stats_task: Optional[asyncio.Task] = None
+        
+    @property
+    def simulate_latency(self) -> bool:
+        """Whether provider calls sleep to mimic real latency"""
+        return self._sleep is asyncio.sleep
+    
+    @simulate_latency.setter
+    def simulate_latency(self, enabled: bool):
+        self._sleep = asyncio.sleep if enabled else _no_sleep
+    
+    async def process_request(self, message: str, user_id: str, context: Optional[Dict] = None) -> Dict:
         """Process AI request with intelligent provider selection"""
         
-        # Select best provider
-        selected_provider = self._select_provider(message, context)
+        message_key = _cache_message_key(message)
+        if message_key is None:
+            return await self._route_request(message, user_id, context)
         
+        cache_key = (user_id, message_key, self.routing_strategy)
+        cached = self._resp_cache.get(cache_key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._resp_cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return {**cached[1], "provider_used": "cache", "processing_time": 0.0}
+            del self._resp_cache[cache_key]
+        self.cache_misses += 1
+        
+        # Single-flight: identical concurrent requests share one provider call
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            try:
+                return {**await asyncio.shield(inflight)}
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                return await self.process_request(message, user_id, context)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
-            # Attempt processing with selected provider
-            result = await self._process_with_provider(selected_provider, message, user_id, context)
+            response = await self._route_request(message, user_id, context)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        else:
+            if is_cacheable_result(response):
+                self._resp_cache[cache_key] = (time.monotonic() + self.cache_ttl, response)
+                if len(self._resp_cache) > self.cache_size:
+                    self._resp_cache.popitem(last=False)
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[cache_key]
+    
+    async def _route_request(self, message: str, user_id: str, context: Optional[Dict] = None) -> Dict:
+        """Queue a request for the micro-batcher and wait for its result"""
+        self._ensure_batcher()
+        future = asyncio.get_running_loop().create_future()
+        pending = self._batch_pending
+        pending.append((message, user_id, context, future))
+        self._batch_ready.set()
+        if len(pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+    
+    def _ensure_batcher(self):
+        """Start the micro-batcher on the running loop if it isn't already"""
+        loop = asyncio.get_running_loop()
+        if self._batcher_task is not None and not self._batcher_task.done() and self._batcher_task.get_loop() is loop:
+            return
+        self._batch_pending = deque()
+        self._batch_ready = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._batch_tasks = {}
+        self._batcher_task = loop.create_task(self._batcher_loop())
+    
+    async def _batcher_loop(self):
+        """Flush queued requests at once when idle, else every batch_timeout or once max_batch_size are waiting"""
+        pending = self._batch_pending
+        while True:
+            await self._batch_ready.wait()
+            # Only hold requests back while earlier batches are still running
+            if self._batch_tasks and len(pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.batch_timeout)
+                except asyncio.TimeoutError:
+                    pass
             
-            # Update provider stats on success
-            self._update_provider_stats(selected_provider, success=True)
+            batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch_size))]
+            if not pending:
+                self._batch_ready.clear()
+            if len(pending) < self.max_batch_size:
+                self._batch_full.clear()
             
-            return {
-                "response": result["response"],
-                "provider_used": selected_provider.value,
-                "confidence": result.get("confidence", 0.8),
-                "processing_time": result.get("processing_time", 0),
-                "cost_estimate": self.providers[selected_provider]["cost"],
-                "status": "success"
-            }
+            # Group by provider so each provider's share of the batch is one call
+            groups: Dict[AIProvider, List[Tuple]] = {}
+            for item in batch:
+                if not item[3].done():
+                    groups.setdefault(self._select_provider(item[0], item[2]), []).append(item)
             
+            for provider, items in groups.items():
+                task = asyncio.create_task(self._process_batch_with_provider(provider, items))
+                self._batch_tasks[task] = items
+                task.add_done_callback(self._discard_batch_task)
+    
+    def _discard_batch_task(self, task: asyncio.Task):
+        """Forget a finished batch task"""
+        self._batch_tasks.pop(task, None)
+    
+    async def process_batch(self, messages: List[Tuple[str, str, Optional[Dict]]]) -> List[Dict]:
+        """Process several (message, user_id, context) requests together"""
+        return await asyncio.gather(*(
+            self.process_request(message, user_id, context) for message, user_id, context in messages
+        ))
+    
+    async def _process_batch_with_provider(self, provider: AIProvider, items: List[Tuple]) -> None:
+        """Run a batch of queued requests through one provider call and resolve their futures"""
+        # Requests cancelled while queued never reach the provider; give their tokens back
+        live = [item for item in items if not item[3].done()]
+        for _ in range(len(items) - len(live)):
+            self._release_admission(provider, refund=True)
+        if not live:
+            return
+        
+        results = await self._route_to_provider(provider, live)
+        
+        for (*_, future), result in zip(live, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def _route_to_provider(self, selected_provider: AIProvider, items: List[Tuple]) -> List[Union[Dict, BaseException]]:
+        """Process queued requests with the selected provider, each falling back on failure"""
+        
+        try:
+            # Attempt processing with selected provider
+            results = await self._call_provider(selected_provider, [(message, context) for message, _, context, _ in items])
+            
+        except asyncio.CancelledError:
+            self._release_admission(selected_provider, refund=False)
+            raise
         except Exception as e:
             # Update provider stats on failure
             self._update_provider_stats(selected_provider, success=False, error=str(e))
             
-            # Try fallback providers
+            # Try fallback providers, per request
             if self.fallback_enabled:
-                return await self._try_fallback_providers(message, user_id, context, exclude=selected_provider)
+                return await asyncio.gather(*(
+                    self._try_fallback_providers(message, user_id, context, exclude=selected_provider)
+                    for message, user_id, context, _ in items
+                ), return_exceptions=True)
             else:
-                raise e
+                return [e] * len(items)
+        else:
+            # Update provider stats on success; the batch was one call
+            processing_time = results[0].get("processing_time")
+            self._update_provider_stats(selected_provider, success=True, processing_time=processing_time)
+            
+            cost = self.providers[selected_provider].cost
+            return [{
+                "response": result["response"],
+                "provider_used": _PROVIDER_VALUE[selected_provider],
+                "confidence": result.get("confidence", 0.8),
+                "processing_time": result.get("processing_time", 0),
+                "cost_estimate": cost,
+                "status": "success"
+            } for result in results]
     
-    def _select_provider(self, message: str, context: Dict = None) -> AIProvider:
+    async def shutdown(self):
+        """Stop the micro-batcher and fail every queued or dispatched request; flush pending stats"""
+        waiting = [item[3] for item in self._batch_pending]
+        for items in self._batch_tasks.values():
+            waiting.extend(item[3] for item in items)
+        
+        tasks = [t for t in (self._batcher_task, self._stats_task, *self._batch_tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future in waiting:
+            if not future.done():
+                future.set_exception(RuntimeError("Hybrid intelligence manager shut down"))
+        self._batch_pending.clear()
+        self._batcher_task = None
+        
+        while not self._stats_queue.empty():
+            self._apply_provider_stats(*self._stats_queue.get_nowait())
+        self._stats_task = None
+    
+    def _select_provider(self, message: str, context: Optional[Dict] = None) -> AIProvider:
         """Select the best provider based on current strategy and conditions"""
         
-        available_providers = [
-            provider for provider, info in self.providers.items()
-            if info["status"] == ProviderStatus.AVAILABLE and self._check_rate_limit(provider)
-        ]
-        
-        if not available_providers:
-            return AIProvider.FALLBACK_LOCAL
-        
-        if self.routing_strategy == "smart":
-            return self._smart_selection(available_providers, message, context)
-        elif self.routing_strategy == "cost_first":
-            return min(available_providers, key=lambda p: self.providers[p]["cost"])
-        elif self.routing_strategy == "speed_first":
-            return min(available_providers, key=lambda p: self.providers[p]["latency"])
-        elif self.routing_strategy == "quality_first":
-            return max(available_providers, key=lambda p: self.providers[p]["quality"])
+        strategy = self.routing_strategy
+        if strategy == "smart":
+            order = self._bucket_order[bisect.bisect_right(_BUCKET_BOUNDS, len(message))]
         else:
-            return min(available_providers, key=lambda p: self.providers[p]["priority"])
+            order = self._strategy_order.get(strategy, self._strategy_order["priority"])
+        
+        now = time.monotonic()
+        for provider in order:
+            if self._admit(provider, now):
+                return provider
+        
+        return AIProvider.FALLBACK_LOCAL
     
-    def _smart_selection(self, providers: List[AIProvider], message: str, context: Dict) -> AIProvider:
-        """Intelligent provider selection based on multiple factors"""
+    def _smart_score(self, info: ProviderInfo, bucket: int) -> float:
+        """Intelligent provider score based on multiple factors"""
+        latency_weight, quality_weight, cost_weight = _BUCKET_WEIGHTS[bucket]
         
-        def calculate_score(provider: AIProvider) -> float:
-            info = self.providers[provider]
-            
-            # Base score from quality and priority
-            score = info["quality"] * 0.4 + (6 - info["priority"]) * 0.1
-            
-            # Penalize high latency
-            score -= info["latency"] * 0.1
-            
-            # Penalize cost (prefer free)
-            score -= info["cost"] * 10
-            
-            # Penalize recent errors
-            score -= info["error_count"] * 0.05
-            
-            # Bonus for local providers (privacy)
-            if "local" in provider.value.lower():
-                score += 0.2
-            
-            # Consider message complexity
-            if len(message) > 500:  # Complex query, prefer high-quality providers
-                score += info["quality"] * 0.2
-            
-            return max(0, score)
+        # Base score from quality and priority
+        score = info.quality * quality_weight + (6 - info.priority) * 0.1
+        
+        # Penalize high latency
+        score -= info.latency * latency_weight
         
-        # Calculate scores and select best
-        scored_providers = [(provider, calculate_score(provider)) for provider in providers]
-        return max(scored_providers, key=lambda x: x[1])[0]
+        # Penalize cost (prefer free)
+        score -= info.cost * cost_weight
+        
+        # Penalize recent errors
+        score -= info.error_count * 0.05
+        
+        # Bonus for local providers (privacy)
+        if info.is_local:
+            score += 0.2
+        
+        # Only the ranking matters, so scores are left unclamped
+        return score
+    
+    def _rebuild_strategy_order(self):
+        """Precompute provider preference order for every routing strategy"""
+        providers = self.providers
+        infos = providers.values()
+        
+        # The canned fallback is never scored against real providers: it always goes last
+        real = [provider for provider in providers if provider != AIProvider.FALLBACK_LOCAL]
+        real_infos = [providers[provider] for provider in real]
+        self._bucket_order = tuple(
+            _rank([self._smart_score(info, bucket) for info in real_infos], real, reverse=True)
+            + (AIProvider.FALLBACK_LOCAL,)
+            for bucket in range(len(_BUCKET_WEIGHTS))
+        )
+        self._strategy_order = {
+            strategy: _rank(map(key, infos), providers, reverse)
+            for strategy, (key, reverse) in _STRATEGY_KEYS.items()
+        }
     
     async def _process_with_provider(self, provider: AIProvider, message: str, user_id: str, context: Dict) -> Dict:
         """Process request with specific provider"""
+        return (await self._call_provider(provider, [(message, context)]))[0]
+    
+    async def _call_provider(self, provider: AIProvider, requests: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Answer (message, context) requests with one call to a provider"""
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        if provider == AIProvider.OLLAMA_LOCAL:
-            result = await self._ollama_process(message, context)
-        elif provider == AIProvider.HUGGINGFACE_LOCAL:
-            result = await self._huggingface_local_process(message, context)
-        elif provider == AIProvider.HUGGINGFACE_CLOUD:
-            result = await self._huggingface_cloud_process(message, context)
-        elif provider == AIProvider.OPENAI_CLOUD:
-            result = await self._openai_process(message, context)
-        else:  # FALLBACK_LOCAL
-            result = await self._fallback_process(message, context)
+        if provider == AIProvider.FALLBACK_LOCAL:
+            results = [await self._fallback_process(message, context) for message, context in requests]
+        else:
+            # The contextual text is provider-independent; providers only add their banner
+            bases = [self._generate_contextual_response(message, context) for message, context in requests]
+            results = await self._dispatch[provider](bases)
         
-        processing_time = time.time() - start_time
-        result["processing_time"] = processing_time
+        processing_time = time.perf_counter() - start_time
+        for result in results:
+            result["processing_time"] = processing_time
         
-        return result
+        return results
     
-    async def _ollama_process(self, message: str, context: Dict) -> Dict:
-        """Process using local Ollama"""
+    async def _ollama_process(self, bases: List[str]) -> List[Dict]:
+        """Process a batch using local Ollama"""
         try:
-            # Simulate Ollama API call (replace with actual implementation)
-            await asyncio.sleep(0.5)  # Simulate processing time
+            # Simulate one Ollama API call for the batch (replace with actual implementation)
+            await self._sleep(0.5)  # Simulate processing time
             
-            response = f"🤖 [Ollama/Llama3.1] {self._generate_contextual_response(message, context)}"
-            
-            return {
-                "response": response,
+            return [{
+                "response": f"🤖 [Ollama/Llama3.1] {base}",
                 "confidence": 0.85
-            }
+            } for base in bases]
         except Exception as e:
             raise Exception(f"Ollama processing failed: {str(e)}")
     
-    async def _huggingface_local_process(self, message: str, context: Dict) -> Dict:
-        """Process using local Hugging Face model"""
+    async def _huggingface_local_process(self, bases: List[str]) -> List[Dict]:
+        """Process a batch using local Hugging Face model"""
         try:
-            await asyncio.sleep(0.8)  # Simulate processing time
+            await self._sleep(0.8)  # Simulate processing time
             
-            response = f"🤖 [HF/Local] {self._generate_contextual_response(message, context)}"
-            
-            return {
-                "response": response,
+            return [{
+                "response": f"🤖 [HF/Local] {base}",
                 "confidence": 0.80
-            }
+            } for base in bases]
         except Exception as e:
             raise Exception(f"Hugging Face local processing failed: {str(e)}")
     
-    async def _huggingface_cloud_process(self, message: str, context: Dict) -> Dict:
-        """Process using Hugging Face cloud API"""
+    async def _huggingface_cloud_process(self, bases: List[str]) -> List[Dict]:
+        """Process a batch using Hugging Face cloud API"""
         try:
-            await asyncio.sleep(0.3)  # Simulate processing time
+            await self._sleep(0.3)  # Simulate processing time
             
-            response = f"🤖 [HF/Cloud] {self._generate_contextual_response(message, context)}"
-            
-            return {
-                "response": response,
+            return [{
+                "response": f"🤖 [HF/Cloud] {base}",
                 "confidence": 0.88
-            }
+            } for base in bases]
         except Exception as e:
             raise Exception(f"Hugging Face cloud processing failed: {str(e)}")
     
-    async def _openai_process(self, message: str, context: Dict) -> Dict:
-        """Process using OpenAI API"""
+    async def _openai_process(self, bases: List[str]) -> List[Dict]:
+        """Process a batch using OpenAI API"""
         try:
-            await asyncio.sleep(0.2)  # Simulate processing time
+            await self._sleep(0.2)  # Simulate processing time
             
-            response = f"🤖 [OpenAI/GPT-4] {self._generate_contextual_response(message, context)}"
-            
-            return {
-                "response": response,
+            return [{
+                "response": f"🤖 [OpenAI/GPT-4] {base}",
                 "confidence": 0.95
-            }
+            } for base in bases]
         except Exception as e:
             raise Exception(f"OpenAI processing failed: {str(e)}")
     
     async def _fallback_process(self, message: str, context: Dict) -> Dict:
         """Basic fallback processing"""
-        templates = [
-            f"I understand you're asking about '{message}'. Let me help you with that.",
-            f"That's an interesting question about '{message}'. Here's what I think...",
-            f"Regarding '{message}', I can provide some insights.",
-            f"I see you mentioned '{message}'. Let me assist you."
-        ]
-        
-        response = random.choice(templates)
+        # Rotate through the templates; only the chosen one is formatted
+        template = _FALLBACK_TEMPLATES[self._fallback_counter & 3]
+        self._fallback_counter += 1
+        response = template.format(message=message)
         
         return {
             "response": response,
@@ -264,62 +586,40 @@ class HybridIntelligenceManager:
     
     def _generate_contextual_response(self, message: str, context: Dict) -> str:
         """Generate contextual response based on message and context"""
-        message_lower = message.lower()
-
         # Detect language and respond appropriately
-        if any(word in message for word in ["नमस्ते", "हेलो"]):  # Hindi
-            if any(word in message for word in ["नमस्ते"]):
-                return "नमस्ते! मैं IRIS हूं, आपका बुद्धिमान सहायक। मैं आपकी कैसे मदद कर सकता हूं?"
-            return "हैलो! मैं IRIS हूं। आपका स्वागत है!"
-
-        elif any(word in message_lower for word in ["hello", "hi", "hey", "helo"]):
-            return "Hello! I'm IRIS, powered by advanced AI. How can I assist you today?"
-
-        elif any(word in message_lower for word in ["what can you do", "capabilities", "help"]):
-            return (
-                "I'm IRIS, your intelligent voice assistant! Here's what I can do for you:\n\n"
-                "🎤 Voice Interaction: Natural speech recognition in multiple languages\n"
-                "🧠 AI Intelligence: Powered by a hybrid local/cloud AI for optimal performance\n"
-                "🌐 Web Integration: Search the web and gather information\n"
-                "📅 Task Management: Assist with scheduling, reminders, and organization\n"
-                "📂 File Processing: Read and analyze documents, PDFs, and text files\n"
-                "🗣️ Multi-language Support: Communicate fluently in English, Hindi, and more\n"
-                "🔒 Privacy-First: Prioritize local processing to keep your data secure\n\n"
-                "Just speak naturally, and I'll understand exactly what you need!"
-            )
-
-        elif any(word in message_lower for word in ["okay", "ok", "good", "fine"]):
-            return "Great! Is there anything specific you'd like me to help you with? I'm here and ready to assist!"
-
-        elif any(word in message_lower for word in ["weather", "temperature"]):
-            return "I can help with weather information. Weather integration is being enhanced with multiple data sources."
-
-        elif any(word in message_lower for word in ["time", "date", "clock"]):
-            return f"The current time is {time.strftime('%H:%M:%S')} on {time.strftime('%Y-%m-%d')}. I'm running in hybrid mode for optimal performance."
-
-        else:
-            return f"I understand you said: '{message}'. I'm processing this using my hybrid intelligence system that combines local privacy with cloud capabilities. How can I help you further?"
-
+        greeting = match_hindi_greeting(message)
+        if greeting is not None:
+            return _HINDI_RESPONSES[greeting]
+        
+        matched = match_intents(message.lower())
+        if matched:
+            for intent, reply, _ in _CONTEXTUAL_RESPONSES:
+                if intent in matched:
+                    return reply if isinstance(reply, str) else reply()
+        return f"I understand you said: '{message}'. I'm processing this using my hybrid intelligence system that combines local privacy with cloud capabilities. How can I help you further?"
     
     async def _try_fallback_providers(self, message: str, user_id: str, context: Dict, exclude: AIProvider) -> Dict:
         """Try alternative providers when primary fails"""
         
-        available_providers = [
-            provider for provider in self.providers.keys()
-            if provider != exclude and self.providers[provider]["status"] == ProviderStatus.AVAILABLE
-        ]
-        
-        # Sort by priority
-        available_providers.sort(key=lambda p: self.providers[p]["priority"])
-        
-        for provider in available_providers:
+        # Precomputed priority order
+        now = time.monotonic()
+        for provider in self._strategy_order["priority"]:
+            if provider == exclude or not self._admit(provider, now):
+                continue
             try:
                 result = await self._process_with_provider(provider, message, user_id, context)
-                result["fallback_used"] = True
-                result["original_provider_failed"] = exclude.value
-                return result
-            except Exception:
+            except asyncio.CancelledError:
+                self._release_admission(provider, refund=False)
+                raise
+            except Exception as e:
+                self._update_provider_stats(provider, success=False, error=str(e))
                 continue
+            self._update_provider_stats(provider, success=True, processing_time=result.get("processing_time"))
+            result["provider_used"] = _PROVIDER_VALUE[provider]
+            result["status"] = "success"
+            result["fallback_used"] = True
+            result["original_provider_failed"] = _PROVIDER_VALUE[exclude]
+            return result
         
         # If all providers fail, use basic fallback
         return {
@@ -329,57 +629,141 @@ class HybridIntelligenceManager:
             "status": "degraded"
         }
     
-    def _check_rate_limit(self, provider: AIProvider) -> bool:
-        """Check if provider is within rate limits"""
-        rate_limit = self.providers[provider].get("rate_limit")
+    def _take_rate_token(self, provider: AIProvider) -> bool:
+        """Spend one rate-limit token for a request admitted to provider; False if the bucket is empty"""
+        rate_limit = self.providers[provider].rate_limit
         if not rate_limit:
             return True
         
-        # Simple rate limiting check (implement more sophisticated logic as needed)
-        current_time = time.time()
-        if "per_hour" in rate_limit:
-            # Reset hourly counters
-            if current_time - self.providers[provider]["last_used"] > 3600:
-                rate_limit["current"] = 0
-        elif "per_minute" in rate_limit:
-            # Reset minute counters
-            if current_time - self.providers[provider]["last_used"] > 60:
-                rate_limit["current"] = 0
-        
-        return rate_limit["current"] < rate_limit["max_requests"]
+        # Refill the bucket for the time elapsed since the last check
+        now = time.monotonic()
+        rate_limit.tokens = min(rate_limit.capacity, rate_limit.tokens + (now - rate_limit.last_refill) * rate_limit.refill_per_sec)
+        rate_limit.last_refill = now
+        if rate_limit.tokens < 1:
+            return False
+        # Spent at admission, so concurrent requests can't all pass the same check
+        rate_limit.tokens -= 1
+        return True
+    
+    def _refund_rate_token(self, provider: AIProvider):
+        """Return the token of an admitted request that never reached the provider"""
+        rate_limit = self.providers[provider].rate_limit
+        if rate_limit:
+            rate_limit.tokens = min(rate_limit.capacity, rate_limit.tokens + 1)
     
-    def _update_provider_stats(self, provider: AIProvider, success: bool, error: str = None):
-        """Update provider statistics"""
-        self.providers[provider]["last_used"] = time.time()
+    @staticmethod
+    def _is_available(info: ProviderInfo, now: float) -> bool:
+        """Available, or tripped with its backoff expired and no probe out yet (half-open)"""
+        if info.status == ProviderStatus.AVAILABLE:
+            return True
+        return info.status == ProviderStatus.ERROR and info.disabled_until <= now and not info.probe_in_flight
+    
+    def _admit(self, provider: AIProvider, now: float) -> bool:
+        """Admit one request: provider available, within its rate limit, and claimed as the probe if half-open"""
+        info = self.providers[provider]
+        if not self._is_available(info, now) or not self._take_rate_token(provider):
+            return False
+        if info.status == ProviderStatus.ERROR:
+            info.probe_in_flight = True  # Nothing else is let through until this probe reports
+        return True
+    
+    def _release_admission(self, provider: AIProvider, refund: bool):
+        """Undo an admission whose outcome will never be reported"""
+        if refund:
+            self._refund_rate_token(provider)
+        self.providers[provider].probe_in_flight = False
+    
+    def _update_provider_stats(self, provider: AIProvider, success: bool, error: Optional[str] = None,
+                               processing_time: Optional[float] = None):
+        """Update provider statistics (health bookkeeping is applied write-behind)"""
+        now = time.monotonic()
+        try:
+            self._ensure_stats_consumer()
+        except RuntimeError:  # No running loop; apply inline
+            self._apply_provider_stats(provider, success, error, now, processing_time)
+            return
+        self._stats_queue.put_nowait((provider, success, error, now, processing_time))
+    
+    def _ensure_stats_consumer(self):
+        """Start the stats consumer on the running loop if it isn't already"""
+        loop = asyncio.get_running_loop()
+        if self._stats_task is not None and not self._stats_task.done() and self._stats_task.get_loop() is loop:
+            return
+        # Outcomes left behind by a stopped consumer are applied before starting afresh
+        while not self._stats_queue.empty():
+            self._apply_provider_stats(*self._stats_queue.get_nowait())
+        self._stats_queue = asyncio.Queue()
+        self._stats_task = loop.create_task(self._stats_consumer())
+    
+    async def _stats_consumer(self):
+        """Apply queued provider outcomes off the request path"""
+        queue = self._stats_queue
+        while True:
+            self._apply_provider_stats(*await queue.get())
+    
+    def _apply_provider_stats(self, provider: AIProvider, success: bool, error: Optional[str],
+                              timestamp: float, processing_time: Optional[float] = None):
+        """Apply one provider outcome to its health, circuit breaker and routing order"""
+        info = self.providers[provider]
+        info.last_used = timestamp
+        health = (info.error_count, info.status)
+        
+        # A run of slow successes is treated like a failure
+        if success and processing_time is not None:
+            if processing_time > info.latency * self.SLOW_FACTOR:
+                info.slow_streak += 1
+                if info.slow_streak >= self.SLOW_STREAK_LIMIT:
+                    info.slow_streak = 0
+                    success = False
+            else:
+                info.slow_streak = 0
+        
+        # The probe has reported: the breaker either closes or re-trips below
+        info.probe_in_flight = False
         
         if success:
-            self.providers[provider]["error_count"] = max(0, self.providers[provider]["error_count"] - 1)
-            if self.providers[provider]["status"] == ProviderStatus.ERROR:
-                self.providers[provider]["status"] = ProviderStatus.AVAILABLE
+            info.error_count = max(0, info.error_count - 1)
+            info.consecutive_failures = 0
+            if info.status == ProviderStatus.ERROR:
+                # Half-open probe succeeded; close the breaker
+                info.status = ProviderStatus.AVAILABLE
+                info.disabled_until = 0
         else:
-            self.providers[provider]["error_count"] += 1
-            if self.providers[provider]["error_count"] >= 3:
-                self.providers[provider]["status"] = ProviderStatus.ERROR
+            info.error_count += 1
+            info.consecutive_failures += 1
+            # A failed half-open probe re-trips immediately, with a longer backoff
+            if info.consecutive_failures >= self.FAILURE_THRESHOLD or info.status == ProviderStatus.ERROR:
+                info.status = ProviderStatus.ERROR
+                info.disabled_until = timestamp + min(self.MAX_BACKOFF, 2 ** info.consecutive_failures)
         
-        # Update rate limit counters
-        rate_limit = self.providers[provider].get("rate_limit")
-        if rate_limit:
-            rate_limit["current"] += 1
+        if health != (info.error_count, info.status):
+            self._rebuild_strategy_order()
     
     def get_provider_status(self) -> Dict:
         """Get current status of all providers"""
         return {
-            provider.value: {
-                "status": info["status"].value,
-                "priority": info["priority"],
-                "quality": info["quality"],
-                "latency": info["latency"],
-                "cost": info["cost"],
-                "error_count": info["error_count"]
+            _PROVIDER_VALUE[provider]: {
+                "status": info.status.value,
+                "priority": info.priority,
+                "quality": info.quality,
+                "latency": info.latency,
+                "cost": info.cost,
+                "error_count": info.error_count
             }
             for provider, info in self.providers.items()
         }
     
+    def get_cache_stats(self) -> Dict:
+        """Get response cache statistics"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "size": len(self._resp_cache),
+            "max_size": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0
+        }
+    
     def set_routing_strategy(self, strategy: str):
         """Change routing strategy"""
         valid_strategies = ["smart", "cost_first", "speed_first", "quality_first"]
@@ -388,5 +772,8 @@ class HybridIntelligenceManager:
         else:
             raise ValueError(f"Invalid strategy. Must be one of: {valid_strategies}")
 
+async def _no_sleep(delay: float) -> None:
+    """Stand-in for asyncio.sleep when latency simulation is off"""
+
 # Global hybrid intelligence manager
 hybrid_ai = HybridIntelligenceManager()
@@ -0,0 +1,76 @@
+"""
+IRIS Intent Patterns Module
+Single-pass keyword matching shared by IRIS core and hybrid intelligence
+"""
+
+import re
+from typing import Optional, Set
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keyword categories, matched as whole words against lowercased messages
+INTENT_KEYWORDS = {
+    "greeting": ("hello", "hi", "hey", "helo"),
+    "help": ("what can you do", "capabilities", "help"),
+    "acknowledge": ("okay", "ok", "good", "fine"),
+    "weather": ("weather", "temperature"),
+    "time": ("time", "date", "clock"),
+    "farewell": ("bye", "goodbye", "see you"),
+    "wellbeing": ("how are you", "how do you do"),
+    "identity": ("name", "who are you")
+}
+
+# Hindi greetings in priority order, only searched when Devanagari is present
+HINDI_GREETINGS = ("नमस्ते", "हेलो")
+_DEVANAGARI_RE = re.compile("[\u0900-\u097f]")
+
+def has_devanagari(text: str) -> bool:
+    """Whether any character falls in the Devanagari block (U+0900-U+097F)"""
+    return _DEVANAGARI_RE.search(text) is not None
+
+def match_hindi_greeting(message: str) -> Optional[str]:
+    """Return the first Hindi greeting in the message, if any"""
+    if not has_devanagari(message):
+        return None
+    for greeting in HINDI_GREETINGS:
+        if greeting in message:
+            return greeting
+    return None
+
+def _is_word_char(char: str) -> bool:
+    """Same notion of a word character as the regex \\w class"""
+    return char.isalnum() or char == "_"
+
+if AHOCORASICK_AVAILABLE:
+    _AUTOMATON = ahocorasick.Automaton()
+    for _category, _words in INTENT_KEYWORDS.items():
+        for _word in _words:
+            _AUTOMATON.add_word(_word, (_category, len(_word)))
+    _AUTOMATON.make_automaton()
+
+    def match_intents(message_lower: str) -> Set[str]:
+        """Return every keyword category present in the message, in one pass"""
+        matched = set()
+        last = len(message_lower) - 1
+        for end, (category, length) in _AUTOMATON.iter(message_lower):
+            start = end - length + 1
+            if (start > 0 and _is_word_char(message_lower[start - 1])) or \
+                    (end < last and _is_word_char(message_lower[end + 1])):
+                continue
+            matched.add(category)
+        return matched
+else:
+    # One alternation with a named group per category
+    _INTENT_RE = re.compile("|".join(
+        rf"\b(?P<{category}>" + "|".join(map(re.escape, words)) + r")\b"
+        for category, words in INTENT_KEYWORDS.items()
+    ))
+
+    def match_intents(message_lower: str) -> Set[str]:
+        """Return every keyword category present in the message, in one pass"""
+        # Every alternative is a named group, so lastgroup is always set
+        return {match.lastgroup for match in _INTENT_RE.finditer(message_lower) if match.lastgroup}
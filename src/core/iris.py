@@ -3,37 +3,89 @@ IRIS Core Intelligence Module
 Basic AI reasoning and response generation
 """
 
-import asyncio
-from typing import Dict, List, Optional
+from itertools import islice
+from collections import defaultdict, deque
+from typing import Callable, DefaultDict, Deque, Dict, List, Optional, Tuple, Union
+import httpx
 import json
 from datetime import datetime
 from src.core.hybrid_intelligence import hybrid_ai
+from src.core.intents import match_intents
+
+# (keyword category, intent) pairs; the first category present in a message wins
+_INTENT_TABLE = (
+    ("greeting", "greeting"),
+    ("help", "help_request"),
+    ("time", "time_query"),
+    ("weather", "weather_query"),
+    ("farewell", "farewell"),
+)
+
+_HELP_RESPONSE = """🤖 I can help you with:
+            • Voice conversations and natural language processing
+            • Task planning and execution
+            • Web searching and information retrieval
+            • Calendar and scheduling management
+            • File processing and document analysis
+            • And much more! I'm still learning and growing."""
+
+_GREETING_RESPONSE = "🤖 Hello! I'm IRIS, your intelligent voice assistant. How can I help you today?"
+_WELLBEING_RESPONSE = "🤖 I'm functioning perfectly! All systems are operational and ready to assist you."
+_IDENTITY_RESPONSE = "🤖 I'm IRIS - Intelligent Responsive Interface System. I'm here to help you with various tasks through voice interaction!"
+_WEATHER_RESPONSE = "🤖 Weather integration is coming soon! I'll be able to check current weather and forecasts for you."
+_FAREWELL_RESPONSE = "🤖 Goodbye! It was great talking with you. I'll be here whenever you need assistance!"
+
+def _time_response() -> str:
+    """Current time reply, from a single clock read"""
+    return datetime.now().strftime("🤖 The current time is %H:%M:%S on %Y-%m-%d")
+
+# (keyword category, reply) pairs; the first category present in a message wins.
+# Replies are constant strings, or zero-argument callables for live values.
+_BASIC_RESPONSES: Tuple[Tuple[str, Union[str, Callable[[], str]]], ...] = (
+    ("greeting", _GREETING_RESPONSE),
+    ("wellbeing", _WELLBEING_RESPONSE),
+    ("identity", _IDENTITY_RESPONSE),
+    ("help", _HELP_RESPONSE),
+    ("time", _time_response),
+    ("weather", _WEATHER_RESPONSE),
+    ("farewell", _FAREWELL_RESPONSE),
+)
 
 class IRISCore:
     """Core IRIS intelligence system"""
     
-    def __init__(self):
-        self.conversation_history = []
+    def __init__(self, history_size: int = 200):
+        # Bounded per-user history: O(1) append, old turns age out
+        self.history_size = history_size
+        self.conversation_history: DefaultDict[str, Deque[Dict]] = defaultdict(lambda: deque(maxlen=self.history_size))
         self.user_context = {}
         self.is_initialized = False
+        self.http_client: Optional[httpx.AsyncClient] = None  # Shared pooled client, set at startup
     
     async def initialize(self):
         """Initialize IRIS core systems"""
         print("🤖 Initializing IRIS Core Intelligence...")
-        # Simulate initialization
-        await asyncio.sleep(1)
+        
         self.is_initialized = True
         print("✅ IRIS Core initialized successfully!")
     
+    async def shutdown(self):
+        """Release IRIS core resources"""
+        await hybrid_ai.shutdown()
+        self.is_initialized = False
+    
     async def process_message(self, message: str, user_id: str = "default") -> Dict:
         """Process user message using hybrid intelligence"""
         
         if not self.is_initialized:
             await self.initialize()
         
+        now_iso = datetime.now().isoformat()
+        
         # Store message in conversation history
-        self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
+        history = self.conversation_history[user_id]
+        history.append({
+            "timestamp": now_iso,
             "user_id": user_id,
             "message": message,
             "type": "user"
@@ -43,14 +95,16 @@ class IRISCore:
         context = self.user_context.get(user_id, {})
         context["conversation_history"] = self.get_conversation_history(user_id, 5)
         
-        # Process through hybrid AI system
+        intent = self._detect_intent(message)
+        
+        # Process through hybrid AI system (which owns the per-user response cache)
         ai_result = await hybrid_ai.process_request(message, user_id, context)
         
         response = ai_result["response"]
         
         # Store response in history
-        self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
+        history.append({
+            "timestamp": now_iso,
             "user_id": user_id,
             "message": response,
             "type": "iris",
@@ -61,73 +115,41 @@ class IRISCore:
         return {
             "response": response,
             "confidence": ai_result["confidence"],
-            "intent": self._detect_intent(message),
+            "intent": intent,
             "context": context,
             "provider_used": ai_result["provider_used"],
             "processing_time": ai_result.get("processing_time", 0),
-            "timestamp": datetime.now().isoformat()
+            "cache_hit": ai_result["provider_used"] == "cache",
+            "timestamp": now_iso
         }
     
     async def _generate_response(self, message: str, user_id: str) -> str:
         """Generate response based on message"""
-        
-        message_lower = message.lower()
-        
-        # Basic intent-based responses
-        if any(greeting in message_lower for greeting in ["hello", "hi", "hey"]):
-            return "🤖 Hello! I'm IRIS, your intelligent voice assistant. How can I help you today?"
-        
-        elif any(word in message_lower for word in ["how are you", "how do you do"]):
-            return "🤖 I'm functioning perfectly! All systems are operational and ready to assist you."
-        
-        elif any(word in message_lower for word in ["name", "who are you"]):
-            return "🤖 I'm IRIS - Intelligent Responsive Interface System. I'm here to help you with various tasks through voice interaction!"
-        
-        elif any(word in message_lower for word in ["help", "what can you do"]):
-            return """🤖 I can help you with:
-            • Voice conversations and natural language processing
-            • Task planning and execution
-            • Web searching and information retrieval
-            • Calendar and scheduling management
-            • File processing and document analysis
-            • And much more! I'm still learning and growing."""
-        
-        elif any(word in message_lower for word in ["time", "date"]):
-            return f"🤖 The current time is {datetime.now().strftime('%H:%M:%S')} on {datetime.now().strftime('%Y-%m-%d')}"
-        
-        elif any(word in message_lower for word in ["weather"]):
-            return "🤖 Weather integration is coming soon! I'll be able to check current weather and forecasts for you."
-        
-        elif any(word in message_lower for word in ["bye", "goodbye", "see you"]):
-            return "🤖 Goodbye! It was great talking with you. I'll be here whenever you need assistance!"
-        
-        else:
-            return f"🤖 I understand you said: '{message}'. I'm still learning, but I'm processing your request. More advanced AI capabilities are coming soon!"
+        matched = match_intents(message.lower())
+        if matched:
+            for category, reply in _BASIC_RESPONSES:
+                if category in matched:
+                    return reply if isinstance(reply, str) else reply()
+        return f"🤖 I understand you said: '{message}'. I'm still learning, but I'm processing your request. More advanced AI capabilities are coming soon!"
     
     def _detect_intent(self, message: str) -> str:
         """Basic intent detection"""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["hello", "hi", "hey"]):
-            return "greeting"
-        elif any(word in message_lower for word in ["help", "what can you do"]):
-            return "help_request"
-        elif any(word in message_lower for word in ["time", "date"]):
-            return "time_query"
-        elif any(word in message_lower for word in ["weather"]):
-            return "weather_query"
-        elif any(word in message_lower for word in ["bye", "goodbye"]):
-            return "farewell"
-        else:
-            return "general_query"
+        matched = match_intents(message.lower())
+        if matched:
+            for category, intent in _INTENT_TABLE:
+                if category in matched:
+                    return intent
+        return "general_query"
     
     def get_conversation_history(self, user_id: str = "default", limit: int = 10) -> List[Dict]:
         """Get recent conversation history"""
-        user_history = [
-            msg for msg in self.conversation_history 
-            if msg.get("user_id") == user_id
-        ]
-        return user_history[-limit:]
+        history = self.conversation_history.get(user_id)
+        if not history:
+            return []
+        # Walk back from the newest entry so only `limit` items are copied
+        recent = list(islice(reversed(history), limit))
+        recent.reverse()
+        return recent
 
 # Global IRIS instance
 iris_core = IRISCore()
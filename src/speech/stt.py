@@ -5,9 +5,16 @@ Web Speech API and offline alternatives
 
 import asyncio
 import json
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, Tuple
 from enum import Enum
 
+# Recognition languages, shared and immutable
+_SUPPORTED_LANGUAGES: Tuple[str, ...] = (
+    "en-US", "en-GB", "es-ES", "fr-FR", "de-DE",
+    "it-IT", "pt-BR", "ru-RU", "ja-JP", "ko-KR",
+    "zh-CN", "hi-IN"
+)
+
 class STTEngine(Enum):
     WEB_SPEECH_API = "web_speech_api"
     WHISPER_LOCAL = "whisper_local" 
@@ -36,13 +43,9 @@ class IRISSpeechToText:
         self.is_listening = False
         return {"status": "stopped"}
     
-    def get_supported_languages(self):
-        """Get list of supported languages"""
-        return [
-            "en-US", "en-GB", "es-ES", "fr-FR", "de-DE",
-            "it-IT", "pt-BR", "ru-RU", "ja-JP", "ko-KR",
-            "zh-CN", "hi-IN"
-        ]
+    def get_supported_languages(self) -> Tuple[str, ...]:
+        """Get supported languages"""
+        return _SUPPORTED_LANGUAGES
 
 # Global STT instance
 iris_stt = IRISSpeechToText()
@@ -5,119 +5,518 @@ High-quality TTS using gTTS and alternatives
 
 import os
 import asyncio
-import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Union
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, Set, Tuple, Union
 from enum import Enum
+from types import MappingProxyType
 import io
-import base64
+import hashlib
+import random
+import re
+import tempfile
+import threading
+import httpx
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 try:
-    from gtts import gTTS
+    from gtts import gTTS, gTTSError
     GTTS_AVAILABLE = True
 except ImportError:
     GTTS_AVAILABLE = False
 
+# SIMD base64 codec when available; same output as the standard library
+try:
+    from pybase64 import b64decode, b64encode
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    from base64 import b64decode, b64encode
+    PYBASE64_AVAILABLE = False
+
+@lru_cache(maxsize=4096)
+def _cache_digest(engine: str, language: str, voice_speed: float, text: str) -> str:
+    """Content address for a synthesized clip"""
+    return hashlib.sha256(f"{engine}\0{language}\0{voice_speed}\0{text}".encode("utf-8")).hexdigest()
+
+# Sentence boundaries: whitespace following terminal punctuation
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def _split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping empty pieces"""
+    return [part for part in _SENTENCE_BOUNDARY.split(text.strip()) if part]
+
+# Google Translate TTS endpoint gTTS talks to (formatted with its tld), and the audio field in its replies
+_GTTS_URL = "https://translate.google.{tld}/_/TranslateWebserverUi/data/batchexecute"
+_GTTS_AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+def _gtts_decode(payload: str) -> bytes:
+    """Extract the MP3 bytes from a batchexecute reply"""
+    for line in payload.splitlines():
+        if "jQ1olc" in line:
+            match = _GTTS_AUDIO_RE.search(line)
+            if match:
+                return b64decode(match.group(1))
+    raise Exception("No audio stream in TTS API response")
+
+def _gtts_render(tts: gTTS) -> bytes:
+    """Render one gTTS clip into memory (blocking HTTPS round trip)"""
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    return buffer.getvalue()
+
+def _scheme_string(text: str) -> str:
+    """Quote text as a Scheme string literal for Festival"""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _publish_file(path: Path, data: bytes):
+    """Atomically create a file; staged in an anonymous O_TMPFILE inode where supported"""
+    if hasattr(os, "O_TMPFILE"):
+        try:
+            fd = os.open(path.parent, os.O_TMPFILE | os.O_WRONLY, 0o644)
+        except OSError:
+            fd = None  # Filesystem without O_TMPFILE support
+        if fd is not None:
+            with open(fd, "wb") as staged:
+                staged.write(data)
+                staged.flush()
+                try:
+                    # Nothing is visible in the directory until the complete clip is linked in
+                    os.link(f"/proc/self/fd/{fd}", path)
+                    return
+                except FileExistsError:
+                    return  # Content-addressed: an identical clip is already cached
+                except OSError:
+                    pass
+    
+    # Unique staging name, so concurrent writers of the same clip can't truncate each other
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with open(fd, "wb") as staged:
+            os.fchmod(staged.fileno(), 0o644)
+            staged.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
 class TTSEngine(Enum):
     GTTS = "gtts"
     FESTIVAL = "festival"
     ESPEAK = "espeak"
     BROWSER_SYNTHESIS = "browser"
 
+# Map language codes to eSpeak voices
+_ESPEAK_LANGUAGES = MappingProxyType({
+    "en": "en",
+    "es": "es",
+    "fr": "fr",
+    "de": "de",
+    "it": "it",
+    "pt": "pt",
+    "ru": "ru",
+    "ja": "ja",
+    "ko": "ko",
+    "zh": "zh",
+    "hi": "hi"
+})
+
+# Supported languages for each TTS engine, shared and immutable
+_SUPPORTED_LANGUAGES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "gtts": (
+        "en", "es", "fr", "de", "it", "pt", "ru", "ja", 
+        "ko", "zh", "hi", "ar", "nl", "pl", "sv", "tr"
+    ),
+    "espeak": (
+        "en", "es", "fr", "de", "it", "pt", "ru", "ja",
+        "ko", "zh", "hi", "ar", "nl", "pl", "sv", "tr",
+        "da", "fi", "no", "cs", "hu", "ro", "sk", "bg"
+    ),
+    "festival": ("en",),
+    "browser": ("all",)  # Depends on browser support
+})
+
+# Seconds of speech per character at voice_speed 1.0 (eSpeak's 150 wpm for
+# alphabetic scripts; syllabic and logographic scripts pack more per character)
+_DURATION_PER_CHAR = MappingProxyType({
+    "en": 0.055,
+    "es": 0.06,
+    "fr": 0.06,
+    "de": 0.065,
+    "it": 0.06,
+    "pt": 0.06,
+    "ru": 0.065,
+    "hi": 0.075,
+    "ja": 0.15,
+    "ko": 0.12,
+    "zh": 0.18
+})
+
+# Page-sized reads when streaming audio out of a subprocess or the cache
+STREAM_CHUNK_SIZE = 4096
+
+# Content types by result audio_format, and of the audio each engine streams
+AUDIO_MEDIA_TYPES = MappingProxyType({
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav"
+})
+_ENGINE_FORMATS = MappingProxyType({
+    TTSEngine.GTTS: "mp3",
+    TTSEngine.ESPEAK: "wav",
+    TTSEngine.FESTIVAL: "wav"
+})
+_STREAM_MEDIA_TYPES = {engine: AUDIO_MEDIA_TYPES[fmt] for engine, fmt in _ENGINE_FORMATS.items()}
+
+# Runs of whitespace collapse to one space, so spacing variants share a cache slot
+_WHITESPACE = re.compile(r"\s+")
+
+def _silent_wav(seconds: float, rate: int = 22050) -> bytes:
+    """16-bit mono PCM WAV of silence"""
+    data_size = int(rate * seconds) * 2
+    return b"".join((
+        b"RIFF", (36 + data_size).to_bytes(4, "little"), b"WAVE",
+        b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"), (1).to_bytes(2, "little"),
+        rate.to_bytes(4, "little"), (rate * 2).to_bytes(4, "little"), (2).to_bytes(2, "little"), (16).to_bytes(2, "little"),
+        b"data", data_size.to_bytes(4, "little"), bytes(data_size)
+    ))
+
+# Silent clips (~50 ms) for text with nothing to pronounce. The MP3 is two
+# MPEG-1 Layer III frames (32 kbps, 44.1 kHz, mono) with empty side info.
+_SILENT_AUDIO = MappingProxyType({
+    "mp3": (b"\xff\xfb\x10\xc0" + bytes(100)) * 2,
+    "wav": _silent_wav(0.05)
+})
+_SILENT_DURATION = 0.05
+
+@dataclass(slots=True)
+class _RequestPool:
+    """speak() request pool bound to one event loop"""
+    loop: asyncio.AbstractEventLoop
+    semaphore: asyncio.Semaphore
+    pending: Deque[Tuple] = field(default_factory=deque)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+    tasks: Set[asyncio.Task] = field(default_factory=set)
+    task: Optional[asyncio.Task] = None
+
+class TTSResult(dict):
+    """Synthesis result carrying raw audio_bytes; audio_base64 is encoded on first access"""
+    
+    def __missing__(self, key):
+        if key == "audio_base64" and "audio_bytes" in self:
+            self._ensure_base64()
+            return self[key]
+        raise KeyError(key)
+    
+    def _ensure_base64(self):
+        """Store the base64 encoding of audio_bytes, if not done yet"""
+        if "audio_base64" not in self:
+            self["audio_base64"] = b64encode(self["audio_bytes"]).decode('ascii')
+    
+    def for_json(self) -> Dict:
+        """Copy for JSON responses: base64 audio, no raw bytes"""
+        if "audio_bytes" not in self:
+            return dict(self)
+        self._ensure_base64()
+        return {key: value for key, value in self.items() if key != "audio_bytes"}
+
 class IRISTextToSpeech:
     """Text-to-Speech handler for IRIS"""
     
-    def __init__(self, engine: TTSEngine = TTSEngine.GTTS):
-        self.engine = engine
+    GTTS_MAX_ATTEMPTS = 3    # Tries per gTTS request when Google answers 429
+    GTTS_RETRY_BASE = 0.1    # Seconds; doubled each retry, plus jitter
+    
+    def __init__(self, engine: TTSEngine = TTSEngine.GTTS, cache_max_bytes: int = 500 * 1024 * 1024,
+                 pool_window: float = 0.02, max_pool_size: int = 32, max_concurrency: int = 8,
+                 max_sentence_concurrency: int = 4):
         self.language = "en"
         self.voice_speed = 1.0
         self.voice_gender = "female"
+        self.gtts_tld = "com"  # Google Translate host, translate.google.<tld>
         self.output_dir = Path("data/audio")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.http_client: Optional[httpx.AsyncClient] = None  # Shared pooled client, set at startup
         
-    async def speak(self, text: str, language: str = None) -> Dict:
+        # On-disk synthesis cache under output_dir/<engine>/, evicted least recently used first.
+        # The index is built once per process and only tracks this process's writes, so with
+        # several server workers cache_max_bytes caps each worker's share, not the directory.
+        self.cache_max_bytes = cache_max_bytes
+        self._cache_index: "OrderedDict[Path, int]" = OrderedDict()  # path -> size, oldest first
+        self._cache_bytes = 0
+        self._cache_loaded = False
+        self._cache_lock = threading.Lock()  # Cache I/O runs in worker threads
+        
+        # Long-lived Festival worker, one utterance at a time
+        self.worker_timeout = 30.0
+        self._festival_proc: Optional[asyncio.subprocess.Process] = None
+        self._festival_lock = asyncio.Lock()
+        
+        # Request pool: speak() calls arriving within pool_window are synthesized together
+        self.pool_window = pool_window
+        self.max_pool_size = max_pool_size
+        self.max_concurrency = max_concurrency
+        self.max_sentence_concurrency = max_sentence_concurrency  # Shared across clips, bounds gTTS fan-out
+        self._pool: Optional[_RequestPool] = None
+        self._sentence_gate = asyncio.Semaphore(max_sentence_concurrency)
+        self._sentence_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._gtts_executor: Optional[ThreadPoolExecutor] = None  # Blocking gTTS calls, kept off the default executor
+        
+        # Engine handlers, resolved once; gTTS falls back to browser synthesis when not installed
+        self._dispatch = {
+            TTSEngine.GTTS: self._gtts_speak if GTTS_AVAILABLE else self._browser_synthesis_speak,
+            TTSEngine.ESPEAK: self._espeak_speak,
+            TTSEngine.FESTIVAL: self._festival_speak,
+            TTSEngine.BROWSER_SYNTHESIS: self._browser_synthesis_speak
+        }
+        self._stream_dispatch = {
+            TTSEngine.ESPEAK: self._espeak_stream,
+            TTSEngine.FESTIVAL: self._festival_stream
+        }
+        if GTTS_AVAILABLE:
+            self._stream_dispatch[TTSEngine.GTTS] = self._gtts_stream
+        self._unavailable_logged: Set[TTSEngine] = set()
+        self.engine = engine  # Resolves self._handler
+    
+    @property
+    def engine(self) -> TTSEngine:
+        return self._engine
+    
+    @engine.setter
+    def engine(self, engine: TTSEngine):
+        self._engine = engine
+        self._handler = self._resolve_handler(engine)
+    
+    def _resolve_handler(self, engine: TTSEngine) -> Callable[[str, str], Awaitable[Dict]]:
+        """Bound synthesis method for an engine, falling back to browser synthesis"""
+        handler = self._dispatch.get(engine, self._browser_synthesis_speak)
+        if handler == self._browser_synthesis_speak and engine != TTSEngine.BROWSER_SYNTHESIS \
+                and engine not in self._unavailable_logged:
+            self._unavailable_logged.add(engine)
+            print(f"⚠️ {engine.value} is not available, using browser speech synthesis")
+        return handler
+        
+    async def speak(self, text: str, language: str = None) -> "TTSResult":
         """Convert text to speech and return audio data"""
         lang = language or self.language
+        text = _WHITESPACE.sub(" ", text).strip()
+        
+        # Nothing to pronounce: answer with a short silent clip, no synthesis
+        if not any(char.isalnum() for char in text):
+            silent = self._silent_result(self._engine, text, lang)
+            if silent is not None:
+                return silent
         
         try:
-            if self.engine == TTSEngine.GTTS and GTTS_AVAILABLE:
-                return await self._gtts_speak(text, lang)
-            elif self.engine == TTSEngine.ESPEAK:
-                return await self._espeak_speak(text, lang)
-            elif self.engine == TTSEngine.FESTIVAL:
-                return await self._festival_speak(text, lang)
-            else:
-                return await self._browser_synthesis_speak(text, lang)
+            return await self._pooled_speak(self._handler, text, lang)
                 
         except Exception as e:
-            return {
+            # One structured failure; the client falls back to its own speech synthesis
+            return TTSResult({
                 "success": False,
                 "error": str(e),
-                "fallback": await self._browser_synthesis_speak(text, lang)
-            }
+                "fallback": self._browser_fallback(text, lang)
+            })
     
-    async def _gtts_speak(self, text: str, language: str) -> Dict:
-        """Generate speech using Google Text-to-Speech"""
-        try:
-            # Create gTTS object
-            tts = gTTS(text=text, lang=language, slow=False)
+    def _silent_result(self, engine: TTSEngine, text: str, language: str) -> Optional["TTSResult"]:
+        """Silent clip result for an audio engine, or None when the engine has no audio"""
+        if engine not in self._stream_dispatch:
+            return None
+        audio_format = _ENGINE_FORMATS[engine]
+        return TTSResult({
+            "success": True,
+            "engine": engine.value,
+            "audio_format": audio_format,
+            "audio_bytes": _SILENT_AUDIO[audio_format],
+            "text": text,
+            "language": language,
+            "cached": True,
+            "silent": True,
+            "duration_estimate": _SILENT_DURATION
+        })
+    
+    async def _pooled_speak(self, handler: Callable, text: str, language: str) -> TTSResult:
+        """Queue a clip for the request pool and wait for its result"""
+        if handler == self._browser_synthesis_speak:
+            return TTSResult(await handler(text, language))  # Nothing to synthesize or share
+        pool = self._request_pool()
+        future = pool.loop.create_future()
+        pool.pending.append((handler, language, text, future))
+        pool.ready.set()
+        if len(pool.pending) >= self.max_pool_size:
+            pool.full.set()
+        return TTSResult(await future)  # Shared by every caller of the same text
+    
+    def _request_pool(self) -> _RequestPool:
+        """The request pool for the running loop, started on first use"""
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        if pool is None or pool.loop is not loop or pool.task is None or pool.task.done():
+            pool = self._pool = _RequestPool(loop, asyncio.Semaphore(self.max_concurrency))
+            pool.task = loop.create_task(self._pool_loop(pool))
+        return pool
+    
+    def _sentence_semaphore(self) -> asyncio.Semaphore:
+        """Limit on concurrent gTTS fetches across all clips, rebuilt if the event loop changes"""
+        loop = asyncio.get_running_loop()
+        if self._sentence_loop is not loop:
+            self._sentence_loop = loop
+            self._sentence_gate = asyncio.Semaphore(self.max_sentence_concurrency)
+        return self._sentence_gate
+    
+    async def _pool_loop(self, pool: _RequestPool):
+        """Flush queued clips at once when idle, else every pool_window or once max_pool_size are waiting"""
+        pending = pool.pending
+        while True:
+            await pool.ready.wait()
+            # Only hold clips back while earlier groups are still synthesizing
+            if pool.tasks and len(pending) < self.max_pool_size:
+                try:
+                    await asyncio.wait_for(pool.full.wait(), timeout=self.pool_window)
+                except asyncio.TimeoutError:
+                    pass
             
-            # Save to temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            tts.save(temp_file.name)
+            batch = [pending.popleft() for _ in range(min(len(pending), self.max_pool_size))]
+            if not pending:
+                pool.ready.clear()
+            if len(pending) < self.max_pool_size:
+                pool.full.clear()
             
-            # Read audio data
-            with open(temp_file.name, 'rb') as f:
-                audio_data = f.read()
+            # Group by (engine handler, language); repeated texts in a window are synthesized once
+            groups: Dict[Tuple[Callable, str], Dict[str, List[asyncio.Future]]] = {}
+            for handler, language, text, future in batch:
+                if not future.done():
+                    groups.setdefault((handler, language), {}).setdefault(text, []).append(future)
             
-            # Clean up temporary file
-            os.unlink(temp_file.name)
+            for (handler, language), texts in groups.items():
+                task = asyncio.create_task(self._synthesize_batch(pool.semaphore, handler, language, texts))
+                pool.tasks.add(task)
+                task.add_done_callback(pool.tasks.discard)
+    
+    async def _synthesize_batch(self, semaphore: asyncio.Semaphore, handler: Callable, language: str,
+                                texts: Dict[str, List[asyncio.Future]]):
+        """Synthesize a group of texts concurrently and resolve every waiting future"""
+        async def bounded(text: str) -> Dict:
+            async with semaphore:
+                return await handler(text, language)
+        
+        results = await asyncio.gather(*map(bounded, texts), return_exceptions=True)
+        
+        for futures, result in zip(texts.values(), results):
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
+    async def _gtts_speak(self, text: str, language: str) -> Dict:
+        """Generate speech using Google Text-to-Speech"""
+        try:
+            cache_path = self._cache_path(text, language, "gtts", "mp3")
+            audio_data = await self._cache_get(cache_path)
+            cached = audio_data is not None
             
-            # Convert to base64 for web transmission
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+            if not cached:
+                # One request per sentence, fetched in parallel; MP3 frames concatenate cleanly
+                sentences = _split_sentences(text) or [text]
+                audio_data = b"".join(await asyncio.gather(*(
+                    self._gtts_sentence(sentence, language) for sentence in sentences
+                )))
+                await self._cache_put(cache_path, audio_data)
             
-            return {
+            return TTSResult({
                 "success": True,
                 "engine": "gtts",
                 "audio_format": "mp3",
-                "audio_base64": audio_base64,
+                "audio_bytes": audio_data,
                 "text": text,
                 "language": language,
-                "duration_estimate": len(text) * 0.1  # Rough estimate
-            }
+                "cached": cached,
+                "duration_estimate": self._duration_estimate(text, language)
+            })
             
         except Exception as e:
             raise Exception(f"gTTS error: {str(e)}")
     
+    async def _gtts_sentence(self, text: str, language: str) -> bytes:
+        """Render one sentence, at most max_sentence_concurrency at once"""
+        async with self._sentence_semaphore():
+            client = self.http_client
+            if client is not None:
+                return b"".join(await asyncio.gather(*self._gtts_requests(client, text, language)))
+            for attempt in range(self.GTTS_MAX_ATTEMPTS - 1):
+                try:
+                    return await self._gtts_thread(_gtts_render, self._gtts(text, language))
+                except gTTSError as e:
+                    if e.rsp is None or e.rsp.status_code != 429:
+                        raise
+                await asyncio.sleep(self._retry_delay(attempt))
+            return await self._gtts_thread(_gtts_render, self._gtts(text, language))  # Last attempt; errors propagate
+    
+    def _gtts_thread(self, func, *args) -> Awaitable:
+        """Run a blocking gTTS call on its own bounded thread pool"""
+        if self._gtts_executor is None:
+            self._gtts_executor = ThreadPoolExecutor(
+                max_workers=self.max_sentence_concurrency, thread_name_prefix="iris-gtts"
+            )
+        return asyncio.get_running_loop().run_in_executor(self._gtts_executor, func, *args)
+    
+    def _gtts_requests(self, client: httpx.AsyncClient, text: str, language: str) -> List[Awaitable[bytes]]:
+        """One fetch per gTTS text part, sent over the shared keep-alive client"""
+        # gTTS still does the tokenizing and request packaging; only the transport changes
+        tts = self._gtts(text, language)
+        url = _GTTS_URL.format(tld=tts.tld)
+        return [self._gtts_fetch(client, url, body) for body in tts.get_bodies()]
+    
+    async def _gtts_fetch(self, client: httpx.AsyncClient, url: str, body: str) -> bytes:
+        """POST one packaged gTTS request and return its MP3 bytes"""
+        for attempt in range(self.GTTS_MAX_ATTEMPTS):
+            response = await client.post(url, content=body, headers=gTTS.GOOGLE_TTS_HEADERS)
+            if response.status_code != 429 or attempt == self.GTTS_MAX_ATTEMPTS - 1:
+                break
+            await asyncio.sleep(self._retry_delay(attempt))
+        response.raise_for_status()
+        return _gtts_decode(response.text)
+    
+    async def _gtts_bounded_fetch(self, client: httpx.AsyncClient, url: str, body: str) -> bytes:
+        """Fetch one gTTS part, counted against max_sentence_concurrency"""
+        async with self._sentence_semaphore():
+            return await self._gtts_fetch(client, url, body)
+    
+    def _gtts(self, text: str, language: str) -> gTTS:
+        """gTTS request for text, against the configured Google host"""
+        return gTTS(text=text, lang=language, slow=False, tld=self.gtts_tld)
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so rate-limited callers don't retry in lockstep"""
+        return self.GTTS_RETRY_BASE * 2 ** attempt + random.random() * 0.05
+    
     async def _espeak_speak(self, text: str, language: str) -> Dict:
         """Generate speech using eSpeak (local)"""
         try:
-            import subprocess
-            
-            # Map language codes
-            lang_map = {
-                "en": "en",
-                "es": "es",
-                "fr": "fr",
-                "de": "de",
-                "it": "it",
-                "pt": "pt",
-                "ru": "ru",
-                "ja": "ja",
-                "ko": "ko",
-                "zh": "zh",
-                "hi": "hi"
-            }
-            
-            espeak_lang = lang_map.get(language[:2], "en")
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+            espeak_lang = _ESPEAK_LANGUAGES.get(language[:2], "en")
+            cache_path = self._cache_path(text, espeak_lang, "espeak", "wav")
+            audio_data = await self._cache_get(cache_path)
+            if audio_data is not None:
+                return TTSResult({
+                    "success": True,
+                    "engine": "espeak",
+                    "audio_format": "wav",
+                    "audio_bytes": audio_data,
+                    "text": text,
+                    "language": language,
+                    "cached": True,
+                    "duration_estimate": self._duration_estimate(text, language)
+                })
             
-            # Run eSpeak command
+            # Run eSpeak command, reading the WAV from stdout
             cmd = [
                 "espeak",
                 "-v", espeak_lang,
                 "-s", "150",  # Speed
-                "-w", temp_file.name,  # Output file
+                "--stdout",
                 text
             ]
             
@@ -127,23 +526,21 @@ class IRISTextToSpeech:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            await process.communicate()
+            audio_data, _ = await process.communicate()
             
-            if process.returncode == 0:
-                with open(temp_file.name, 'rb') as f:
-                    audio_data = f.read()
+            if process.returncode == 0 and audio_data:
+                await self._cache_put(cache_path, audio_data)
                 
-                os.unlink(temp_file.name)
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                
-                return {
+                return TTSResult({
                     "success": True,
                     "engine": "espeak",
                     "audio_format": "wav",
-                    "audio_base64": audio_base64,
+                    "audio_bytes": audio_data,
                     "text": text,
-                    "language": language
-                }
+                    "language": language,
+                    "cached": False,
+                    "duration_estimate": self._duration_estimate(text, language)
+                })
             else:
                 raise Exception("eSpeak process failed")
                 
@@ -153,49 +550,208 @@ class IRISTextToSpeech:
     async def _festival_speak(self, text: str, language: str) -> Dict:
         """Generate speech using Festival TTS"""
         try:
-            import subprocess
-            
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            
-            # Create Festival script
-            festival_script = f'''
-            (set! text "{text}")
-            (utt.save.wave (utt.synth (eval (list 'Utterance 'Text text))) "{temp_file.name}")
-            '''
-            
-            process = await asyncio.create_subprocess_exec(
-                "festival",
-                "--batch",
-                input=festival_script.encode(),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            await process.communicate()
+            audio_data, cached = await self._festival_audio(text, language)
             
-            if process.returncode == 0 and os.path.exists(temp_file.name):
-                with open(temp_file.name, 'rb') as f:
-                    audio_data = f.read()
-                
-                os.unlink(temp_file.name)
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                
-                return {
-                    "success": True,
-                    "engine": "festival",
-                    "audio_format": "wav",
-                    "audio_base64": audio_base64,
-                    "text": text,
-                    "language": language
-                }
-            else:
-                raise Exception("Festival process failed")
+            return TTSResult({
+                "success": True,
+                "engine": "festival",
+                "audio_format": "wav",
+                "audio_bytes": audio_data,
+                "text": text,
+                "language": language,
+                "cached": cached,
+                "duration_estimate": self._duration_estimate(text, language)
+            })
                 
         except Exception as e:
             raise Exception(f"Festival error: {str(e)}")
     
+    async def _festival_audio(self, text: str, language: str) -> Tuple[bytes, bool]:
+        """Return (WAV bytes, served from cache) for a Festival clip"""
+        cache_path = self._cache_path(text, language, "festival", "wav")
+        audio_data = await self._cache_get(cache_path)
+        if audio_data is not None:
+            return audio_data, True
+        
+        # Festival loads its voices once; every utterance reuses the worker
+        festival_script = f"(utt.save.wave (utt.synth (Utterance Text {_scheme_string(text)})) \"-\" 'riff)\n(fflush nil)\n"
+        async with self._festival_lock:
+            audio_data = await self._festival_request(festival_script.encode())
+        await self._cache_put(cache_path, audio_data)
+        return audio_data, False
+    
+    async def _festival_request(self, script: bytes) -> bytes:
+        """Send one script to the Festival worker and read back the RIFF clip it writes"""
+        if self._festival_proc is None or self._festival_proc.returncode is not None:
+            self._festival_proc = await asyncio.create_subprocess_exec(
+                "festival",
+                "--pipe",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        
+        process = self._festival_proc
+        stdin, stdout = process.stdin, process.stdout
+        assert stdin is not None and stdout is not None  # Opened as pipes above
+        try:
+            stdin.write(script)
+            await stdin.drain()
+            # The RIFF header carries the clip length, which frames the response
+            header = await asyncio.wait_for(stdout.readexactly(8), self.worker_timeout)
+            if header[:4] != b"RIFF":
+                raise Exception("Festival worker returned no audio")
+            body = await asyncio.wait_for(
+                stdout.readexactly(int.from_bytes(header[4:], "little")), self.worker_timeout
+            )
+        except BaseException:
+            # A half-read stream cannot be resynchronized; start fresh next time
+            await self._stop_worker(process)
+            self._festival_proc = None
+            raise
+        return header + body
+    
+    async def _stop_worker(self, process: asyncio.subprocess.Process):
+        """Terminate a synthesis worker process"""
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+    
+    async def shutdown(self):
+        """Stop the request pool, fail anything still queued and stop persistent workers"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            tasks = [t for t in (pool.task, *pool.tasks) if t is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for *_, future in pool.pending:
+                future.cancel()
+            pool.pending.clear()
+        
+        if self._festival_proc is not None:
+            async with self._festival_lock:
+                await self._stop_worker(self._festival_proc)
+                self._festival_proc = None
+        
+        if self._gtts_executor is not None:
+            self._gtts_executor.shutdown(wait=False, cancel_futures=True)
+            self._gtts_executor = None
+    
+    def stream_media_type(self, engine: Optional[TTSEngine] = None) -> Optional[str]:
+        """Content type speak_stream() produces for an engine, or None if it has no audio"""
+        engine = engine or self.engine
+        return _STREAM_MEDIA_TYPES.get(engine) if engine in self._stream_dispatch else None
+    
+    async def speak_stream(self, text: str, language: Optional[str] = None,
+                           engine: Optional[TTSEngine] = None) -> AsyncGenerator[bytes, None]:
+        """Yield audio chunks as they are synthesized, for playback before the clip is complete"""
+        lang = language or self.language
+        engine = engine or self.engine
+        
+        handler = self._stream_dispatch.get(engine)
+        if handler is None:
+            raise Exception(f"{engine.value} does not produce audio")
+        
+        text = _WHITESPACE.sub(" ", text).strip()
+        if not any(char.isalnum() for char in text):
+            yield _SILENT_AUDIO[_ENGINE_FORMATS[engine]]
+            return
+        
+        async for chunk in handler(text, lang):
+            yield chunk
+    
+    @staticmethod
+    async def _iter_chunks(audio_data: bytes) -> AsyncIterator[bytes]:
+        """Yield an in-memory clip in STREAM_CHUNK_SIZE pieces"""
+        view = memoryview(audio_data)
+        for start in range(0, len(view), STREAM_CHUNK_SIZE):
+            yield bytes(view[start:start + STREAM_CHUNK_SIZE])
+    
+    async def _gtts_stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        """Yield MP3 fragments from gTTS as each text part is fetched"""
+        cache_path = self._cache_path(text, language, "gtts", "mp3")
+        audio_data = await self._cache_get(cache_path)
+        if audio_data is not None:
+            async for chunk in self._iter_chunks(audio_data):
+                yield chunk
+            return
+        
+        fragments = []
+        client = self.http_client
+        if client is not None:
+            # Parts are fetched concurrently, within the sentence limit, and yielded in order
+            tts = self._gtts(text, language)
+            url = _GTTS_URL.format(tld=tts.tld)
+            fetches = [asyncio.ensure_future(self._gtts_bounded_fetch(client, url, body)) for body in tts.get_bodies()]
+            try:
+                for fetch in fetches:
+                    fragment = await fetch
+                    fragments.append(fragment)
+                    yield fragment
+            finally:
+                # The listener may stop early; wait out the cancelled fetches so they free their slots
+                for fetch in fetches:
+                    fetch.cancel()
+                await asyncio.gather(*fetches, return_exceptions=True)
+        else:
+            # gTTS fetches one part per request; pull each off the loop as it is ready
+            parts = iter(self._gtts(text, language).stream())
+            while True:
+                async with self._sentence_semaphore():
+                    fragment = await self._gtts_thread(next, parts, None)
+                if fragment is None:
+                    break
+                fragments.append(fragment)
+                yield fragment
+        await self._cache_put(cache_path, b"".join(fragments))
+    
+    async def _festival_stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        """Yield the Festival worker's clip in chunks (it answers one whole file per utterance)"""
+        audio_data, _ = await self._festival_audio(text, language)
+        async for chunk in self._iter_chunks(audio_data):
+            yield chunk
+    
+    async def _espeak_stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        """Yield WAV frames from eSpeak's stdout as they are written"""
+        espeak_lang = _ESPEAK_LANGUAGES.get(language[:2], "en")
+        cache_path = self._cache_path(text, espeak_lang, "espeak", "wav")
+        audio_data = await self._cache_get(cache_path)
+        if audio_data is not None:
+            async for chunk in self._iter_chunks(audio_data):
+                yield chunk
+            return
+        
+        process = await asyncio.create_subprocess_exec(
+            "espeak", "-v", espeak_lang, "-s", "150", "--stdout", text,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout = process.stdout
+        assert stdout is not None  # Opened as a pipe above
+        frames = []
+        try:
+            while True:
+                chunk = await stdout.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                frames.append(chunk)
+                yield chunk
+            if await process.wait() == 0 and frames:
+                await self._cache_put(cache_path, b"".join(frames))
+        finally:
+            # The listener may stop early; don't leave eSpeak running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+    
     async def _browser_synthesis_speak(self, text: str, language: str) -> Dict:
         """Fallback to browser-based speech synthesis"""
+        return self._browser_fallback(text, language)
+    
+    @staticmethod
+    def _browser_fallback(text: str, language: str) -> Dict:
+        """Instructions for the client to speak the text itself"""
         return {
             "success": True,
             "engine": "browser",
@@ -205,21 +761,79 @@ class IRISTextToSpeech:
             "instructions": "Use Web Speech API speechSynthesis on client side"
         }
     
-    def get_supported_languages(self) -> Dict:
+    def _duration_estimate(self, text: str, language: str) -> float:
+        """Estimated playback length in seconds"""
+        return len(text) * _DURATION_PER_CHAR.get(language[:2], 0.08) / self.voice_speed
+    
+    def _cache_path(self, text: str, language: str, engine: str, extension: str) -> Path:
+        """Location of the cached clip for this engine, language, speed and text"""
+        return self.output_dir / engine / f"{_cache_digest(engine, language, self.voice_speed, text)}.{extension}"
+    
+    async def _cache_get(self, path: Path) -> Optional[bytes]:
+        """Read a cached clip without blocking the event loop"""
+        return await asyncio.to_thread(self._cache_read, path)
+    
+    async def _cache_put(self, path: Path, audio_data: bytes):
+        """Write a clip to the cache without blocking the event loop"""
+        await asyncio.to_thread(self._cache_write, path, audio_data)
+    
+    def _cache_read(self, path: Path) -> Optional[bytes]:
+        """Return cached audio bytes, or None on a miss"""
+        try:
+            audio_data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        with self._cache_lock:
+            self._load_cache_index()
+            if path in self._cache_index:
+                self._cache_index.move_to_end(path)
+        try:
+            os.utime(path)  # mtime doubles as the persisted LRU order
+        except FileNotFoundError:
+            pass  # Evicted by another worker after the read; the bytes are still good
+        return audio_data
+    
+    def _cache_write(self, path: Path, audio_data: bytes):
+        """Store audio bytes, evicting least recently used clips over the size cap"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _publish_file(path, audio_data)
+        
+        with self._cache_lock:
+            self._load_cache_index()
+            self._cache_bytes += len(audio_data) - self._cache_index.pop(path, 0)
+            self._cache_index[path] = len(audio_data)
+            evicted = []
+            while self._cache_bytes > self.cache_max_bytes and len(self._cache_index) > 1:
+                old_path, size = self._cache_index.popitem(last=False)
+                self._cache_bytes -= size
+                evicted.append(old_path)
+        for old_path in evicted:
+            try:
+                old_path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _load_cache_index(self):
+        """Build the LRU index from files on disk, oldest mtime first (once; caller holds the lock)"""
+        if self._cache_loaded:
+            return
+        entries = []
+        for path in self.output_dir.glob("*/*"):
+            if path.suffix in (".mp3", ".wav"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another worker mid-scan
+                entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+        for _, path, size in entries:
+            self._cache_index[path] = size
+            self._cache_bytes += size
+        self._cache_loaded = True
+    
+    def get_supported_languages(self) -> Mapping[str, Tuple[str, ...]]:
         """Get supported languages for each TTS engine"""
-        return {
-            "gtts": [
-                "en", "es", "fr", "de", "it", "pt", "ru", "ja", 
-                "ko", "zh", "hi", "ar", "nl", "pl", "sv", "tr"
-            ],
-            "espeak": [
-                "en", "es", "fr", "de", "it", "pt", "ru", "ja",
-                "ko", "zh", "hi", "ar", "nl", "pl", "sv", "tr",
-                "da", "fi", "no", "cs", "hu", "ro", "sk", "bg"
-            ],
-            "festival": ["en"],
-            "browser": ["all"]  # Depends on browser support
-        }
+        return _SUPPORTED_LANGUAGES
 
 # Global TTS instance
 iris_tts = IRISTextToSpeech()
@@ -3,11 +3,21 @@ Pytest configuration and fixtures for IRIS testing
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-from fastapi.testclient import TestClient
-from src.api.server import create_app
+from functools import lru_cache
+from typing import Optional
 from src.core.iris import IRISCore
 
+# One initialized core for the whole session, however many modules ask for it
+_CORE_SINGLETON: Optional[IRISCore] = None
+
+@lru_cache(maxsize=None)
+def _build_app():
+    """Build the IRIS application once; the server module is only imported when needed."""
+    from src.api.server import create_app
+    return create_app()
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -15,24 +25,34 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run anyio-marked tests on asyncio for the whole session."""
+    return "asyncio"
+
+@pytest.fixture(scope="session")
 def test_app():
     """Create a test instance of the IRIS application."""
-    app = create_app()
-    return app
+    return _build_app()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(test_app):
     """Create a test client for the IRIS application."""
+    from fastapi.testclient import TestClient
     with TestClient(test_app) as test_client:
         yield test_client
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session")
 async def iris_core():
     """Create a test instance of IRIS Core."""
-    core = IRISCore()
-    await core.initialize()
-    return core
+    global _CORE_SINGLETON
+    if _CORE_SINGLETON is None:
+        core = IRISCore()
+        await core.initialize()
+        _CORE_SINGLETON = core
+    yield _CORE_SINGLETON
+    await _CORE_SINGLETON.shutdown()
+    _CORE_SINGLETON = None
 
 @pytest.fixture
 def sample_user_message():
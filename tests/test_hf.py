@@ -1,7 +1,51 @@
-from transformers import pipeline
+import os
 
-generator = pipeline("text-generation", model="gpt2")
+import pytest
 
-output = generator("Hello, how are you today?", max_length=50)
+PROMPT = "Hello, how are you today?"
 
-print(output[0]['generated_text'])
+HF_CACHE = os.environ.get("HF_HUB_CACHE") or os.path.join(
+    os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub"
+)
+
+@pytest.fixture(scope="session")
+def gpt2_generator():
+    # Weights already on disk: skip the hub round trips (read when the hub client is imported)
+    if os.path.isdir(os.path.join(HF_CACHE, "models--gpt2", "snapshots")):
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    transformers = pytest.importorskip("transformers")
+    torch = pytest.importorskip("torch")
+
+    use_gpu = torch.cuda.is_available()
+    if not use_gpu:
+        torch.set_num_threads(os.cpu_count())
+        torch.set_float32_matmul_precision("medium")
+
+    generator = transformers.pipeline(
+        "text-generation",
+        model="gpt2",
+        device=0 if use_gpu else -1,
+        torch_dtype=torch.float16 if use_gpu else None,
+    )
+
+    # Fused attention kernels when optimum is installed
+    try:
+        from optimum.bettertransformer import BetterTransformer
+        generator.model = BetterTransformer.transform(generator.model)
+    except (ImportError, ValueError):
+        pass  # optimum missing, or the installed transformers already has native SDPA
+
+    return generator
+
+def test_generate(gpt2_generator):
+    import torch
+
+    with torch.inference_mode():
+        output = gpt2_generator(
+            PROMPT,
+            max_length=50,
+            pad_token_id=gpt2_generator.tokenizer.eos_token_id,
+        )
+
+    assert output[0]['generated_text'].startswith(PROMPT)
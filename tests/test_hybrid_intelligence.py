@@ -0,0 +1,247 @@
+"""
+Tests for the hybrid intelligence manager's routing safeguards
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.core.hybrid_intelligence import AIProvider, HybridIntelligenceManager, ProviderStatus, RateLimit
+
+async def _drain_stats(manager: HybridIntelligenceManager):
+    """Let the write-behind stats consumer apply everything queued so far"""
+    while not manager._stats_queue.empty():
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+@pytest_asyncio.fixture
+async def manager():
+    """A fresh manager routing quality_first, without simulated provider latency"""
+    manager = HybridIntelligenceManager(simulate_latency=False)
+    manager.set_routing_strategy("quality_first")
+    yield manager
+    await manager.shutdown()
+
+@pytest.mark.asyncio
+async def test_breaker_trips_and_admits_single_probe(manager):
+    calls = []
+
+    async def failing(bases):
+        calls.extend(bases)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = failing
+    info = manager.providers[AIProvider.OPENAI_CLOUD]
+
+    for i in range(manager.FAILURE_THRESHOLD):
+        result = await manager.process_request(f"trip request {i}", "test_user", {})
+        assert result["provider_used"] != "openai_cloud"
+    await _drain_stats(manager)
+    assert info.status == ProviderStatus.ERROR
+    assert info.disabled_until > time.monotonic()
+
+    # Backoff expired: a burst gets exactly one request through as the probe
+    info.disabled_until = time.monotonic() - 1
+    calls.clear()
+    await asyncio.gather(*(manager.process_request(f"probe request {i}", "test_user", {}) for i in range(20)))
+    assert len(calls) == 1
+
+    # The failed probe re-trips the breaker
+    await _drain_stats(manager)
+    assert info.status == ProviderStatus.ERROR
+    assert not info.probe_in_flight
+    assert info.disabled_until > time.monotonic()
+
+@pytest.mark.asyncio
+async def test_successful_probe_closes_breaker(manager):
+    info = manager.providers[AIProvider.OPENAI_CLOUD]
+    info.status = ProviderStatus.ERROR
+    info.consecutive_failures = manager.FAILURE_THRESHOLD
+    info.disabled_until = time.monotonic() - 1
+
+    result = await manager.process_request("probe that succeeds", "test_user", {})
+    assert result["provider_used"] == "openai_cloud"
+
+    await _drain_stats(manager)
+    assert info.status == ProviderStatus.AVAILABLE
+    assert info.consecutive_failures == 0
+
+@pytest.mark.asyncio
+async def test_rate_limit_admits_capacity_under_concurrency(manager):
+    manager.providers[AIProvider.OPENAI_CLOUD].rate_limit = RateLimit(capacity=5, window=3600)
+
+    results = await asyncio.gather(*(manager.process_request(f"burst request {i}", "test_user", {}) for i in range(50)))
+
+    used = [result["provider_used"] for result in results]
+    assert used.count("openai_cloud") == 5
+    assert all(result["status"] == "success" for result in results)
+    assert manager.providers[AIProvider.OPENAI_CLOUD].rate_limit.tokens < 1
+
+@pytest.mark.asyncio
+async def test_stats_are_applied_write_behind(manager):
+    info = manager.providers[AIProvider.OPENAI_CLOUD]
+
+    manager._update_provider_stats(AIProvider.OPENAI_CLOUD, success=False, error="provider down")
+    assert info.consecutive_failures == 0
+
+    await _drain_stats(manager)
+    assert info.consecutive_failures == 1
+    assert info.error_count == 1
+
+@pytest.mark.asyncio
+async def test_rate_token_is_spent_at_admission(manager):
+    info = manager.providers[AIProvider.OPENAI_CLOUD]
+    tokens = info.rate_limit.tokens
+
+    assert manager._select_provider("admitted request") == AIProvider.OPENAI_CLOUD
+    assert info.rate_limit.tokens == pytest.approx(tokens - 1, abs=0.01)
+
+    # A request dropped before the call gets its token back
+    manager._release_admission(AIProvider.OPENAI_CLOUD, refund=True)
+    assert info.rate_limit.tokens == pytest.approx(tokens, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_call(manager):
+    calls = []
+    openai = manager._dispatch[AIProvider.OPENAI_CLOUD]
+
+    async def counted(bases):
+        calls.extend(bases)
+        await asyncio.sleep(0.01)
+        return await openai(bases)
+
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = counted
+
+    results = await asyncio.gather(*(manager.process_request("What is single flight?", "test_user", {}) for _ in range(10)))
+
+    assert len(calls) == 1
+    assert len({result["response"] for result in results}) == 1
+    # Each caller gets its own copy of the shared result
+    assert len({id(result) for result in results}) == 10
+
+@pytest.mark.asyncio
+async def test_fallback_answers_are_not_cached(manager):
+    openai = manager._dispatch[AIProvider.OPENAI_CLOUD]
+
+    async def failing(bases):
+        raise RuntimeError("provider down")
+
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = failing
+    degraded = await manager.process_request("hello there", "test_user", {})
+    assert degraded["fallback_used"]
+
+    # Once the provider recovers its answer is served, not the cached fallback
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = openai
+    recovered = await manager.process_request("hello there", "test_user", {})
+    assert recovered["provider_used"] == "openai_cloud"
+
+@pytest.mark.asyncio
+async def test_echoed_replies_are_cached_per_exact_message(manager):
+    first = await manager.process_request("Tell me about PARIS", "test_user", {})
+    second = await manager.process_request("tell me about paris", "test_user", {})
+
+    assert "'Tell me about PARIS'" in first["response"]
+    assert "'tell me about paris'" in second["response"]
+    assert second["provider_used"] == "openai_cloud"
+
+    # Intent replies don't echo, so wording variants share one cache slot
+    await manager.process_request("Hello", "test_user", {})
+    assert (await manager.process_request("hello", "test_user", {}))["provider_used"] == "cache"
+
+@pytest.mark.asyncio
+async def test_cache_is_per_user_and_expires(manager):
+    await manager.process_request("Hello", "user_a", {})
+    assert (await manager.process_request("Hello", "user_b", {}))["provider_used"] == "openai_cloud"
+    assert (await manager.process_request("Hello", "user_a", {}))["provider_used"] == "cache"
+
+    # Age user_a's entry past its TTL
+    key = next(key for key in manager._resp_cache if key[0] == "user_a")
+    manager._resp_cache[key] = (time.monotonic() - 1, manager._resp_cache[key][1])
+    assert (await manager.process_request("Hello", "user_a", {}))["provider_used"] == "openai_cloud"
+    assert manager.get_cache_stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_batch_shares_one_provider_call(manager):
+    calls = []
+    openai = manager._dispatch[AIProvider.OPENAI_CLOUD]
+
+    async def counted(bases):
+        calls.append(bases)
+        await asyncio.sleep(0.01)
+        return await openai(bases)
+
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = counted
+    await manager.process_request("warm up the batcher", "test_user", {})
+    calls.clear()
+
+    # A batch is in flight, so the next requests queue up and go out together
+    first = asyncio.ensure_future(manager.process_request("first in flight", "test_user", {}))
+    await asyncio.sleep(0)
+    results = await asyncio.gather(*(manager.process_request(f"batched request {i}", "test_user", {}) for i in range(5)))
+    await first
+
+    assert [len(bases) for bases in calls] == [1, 5]
+    assert [f"batched request {i}" in result["response"] for i, result in enumerate(results)] == [True] * 5
+
+@pytest.mark.asyncio
+async def test_shutdown_fails_dispatched_requests():
+    manager = HybridIntelligenceManager(simulate_latency=False)
+    manager.set_routing_strategy("quality_first")
+    started = asyncio.Event()
+
+    async def hanging(bases):
+        started.set()
+        await asyncio.Event().wait()
+
+    manager._dispatch[AIProvider.OPENAI_CLOUD] = hanging
+    dispatched = asyncio.ensure_future(manager.process_request("never answered", "test_user", {}))
+    await started.wait()
+    queued = asyncio.ensure_future(manager.process_request("still queued", "test_user", {}))
+    await asyncio.sleep(0)
+
+    await manager.shutdown()
+
+    for request in (dispatched, queued):
+        with pytest.raises(RuntimeError, match="shut down"):
+            await asyncio.wait_for(request, timeout=1.0)
+
+def test_bucket_orders_keep_fallback_last():
+    manager = HybridIntelligenceManager(simulate_latency=False)
+    real = {"ollama_local", "huggingface_local", "huggingface_cloud", "openai_cloud"}
+
+    for order in manager._bucket_order:
+        assert {provider.value for provider in order[:-1]} == real
+        assert order[-1] == AIProvider.FALLBACK_LOCAL
+
+    # Errors on real providers never rank the canned fallback above them
+    for provider, info in manager.providers.items():
+        if provider != AIProvider.FALLBACK_LOCAL:
+            info.error_count = 10
+    manager._rebuild_strategy_order()
+    assert all(order[-1] == AIProvider.FALLBACK_LOCAL for order in manager._bucket_order)
+
+def test_buckets_route_short_fast_and_long_for_quality():
+    manager = HybridIntelligenceManager(simulate_latency=False)
+    manager.set_routing_strategy("smart")
+    providers = manager.providers
+
+    short = manager._select_provider("hi")
+    long = manager._select_provider("explain this in depth " * 60)
+
+    fastest_free = min((p for p, info in providers.items() if info.cost == 0 and p != AIProvider.FALLBACK_LOCAL),
+                       key=lambda p: providers[p].latency)
+    best_quality = max(providers, key=lambda p: providers[p].quality)
+    assert short == fastest_free == AIProvider.HUGGINGFACE_CLOUD
+    assert long == best_quality == AIProvider.OPENAI_CLOUD
+    assert len(set(manager._bucket_order)) > 1
+
+@pytest.mark.asyncio
+async def test_short_message_skips_to_next_real_provider(manager):
+    manager.set_routing_strategy("smart")
+    manager.providers[AIProvider.HUGGINGFACE_CLOUD].status = ProviderStatus.UNAVAILABLE
+
+    assert manager._select_provider("hi") == manager._bucket_order[0][1]
+    assert manager._select_provider("hi") != AIProvider.FALLBACK_LOCAL
@@ -0,0 +1,58 @@
+"""
+Tests for the IRIS API server's WebSocket writer and endpoints
+"""
+
+import asyncio
+
+import pytest
+
+from src.api.server import WSWriter
+
+class RecordingSocket:
+    """Stand-in WebSocket that records frames and can hold each send open"""
+
+    def __init__(self):
+        self.frames = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def send_bytes(self, data: bytes):
+        await self.release.wait()
+        self.frames.append(data)
+
+@pytest.mark.asyncio
+async def test_ws_writer_coalesces_frames_queued_during_a_send():
+    socket = RecordingSocket()
+    writer = WSWriter(socket)
+    writer.start()
+
+    # Hold the first send open; everything queued meanwhile goes out as one frame
+    socket.release.clear()
+    writer.enqueue(b'{"n":0}')
+    await asyncio.sleep(0)
+    for n in range(1, 4):
+        writer.enqueue(b'{"n":%d}' % n)
+    socket.release.set()
+    await asyncio.sleep(0.01)
+
+    assert socket.frames == [b'{"n":0}', b'{"n":1}\n{"n":2}\n{"n":3}']
+    await writer.close()
+
+@pytest.mark.asyncio
+async def test_ws_writer_drops_oldest_frames_for_a_slow_client():
+    socket = RecordingSocket()
+    writer = WSWriter(socket)
+
+    total = WSWriter.MAX_PENDING + 4
+    for n in range(total):
+        writer.enqueue(b'{"n":%d}' % n)
+
+    assert writer.pending == WSWriter.MAX_PENDING
+    assert writer.dropped == 4
+
+    writer.start()
+    await asyncio.sleep(0.01)
+    sent = b"\n".join(socket.frames).split(b"\n")
+    assert sent[0] == b'{"n":4}'
+    assert sent[-1] == b'{"n":%d}' % (total - 1)
+    await writer.close()
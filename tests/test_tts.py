@@ -0,0 +1,198 @@
+"""
+Tests for the IRIS text-to-speech cache, result encoding and /speak negotiation
+"""
+
+import asyncio
+import base64
+
+import httpx
+import orjson
+import pytest
+
+from src.speech.tts import IRISTextToSpeech, TTSEngine, TTSResult, iris_tts
+
+@pytest.fixture
+def tts(tmp_path, monkeypatch):
+    """A TTS handler whose on-disk cache lives in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return IRISTextToSpeech(cache_max_bytes=2500)
+
+def test_cache_write_publishes_clip(tts):
+    path = tts._cache_path("hello", "en", "gtts", "mp3")
+    tts._cache_write(path, b"ID3" + b"a" * 997)
+
+    assert path.read_bytes() == b"ID3" + b"a" * 997
+    assert tts._cache_read(path) == path.read_bytes()
+    assert tts._cache_read(tts._cache_path("never written", "en", "gtts", "mp3")) is None
+    # Nothing half-written is left beside the clip
+    assert list(path.parent.iterdir()) == [path]
+
+def test_cache_write_without_o_tmpfile_stages_uniquely(tts, monkeypatch):
+    monkeypatch.delattr("os.O_TMPFILE", raising=False)
+    path = tts._cache_path("fallback", "en", "gtts", "mp3")
+    tts._cache_write(path, b"ID3 fallback")
+
+    assert path.read_bytes() == b"ID3 fallback"
+    assert list(path.parent.iterdir()) == [path]
+
+def test_cache_evicts_least_recently_used(tts):
+    paths = [tts._cache_path(text, "en", "gtts", "mp3") for text in ("one", "two", "three")]
+    tts._cache_write(paths[0], b"1" * 1000)
+    tts._cache_write(paths[1], b"2" * 1000)
+    tts._cache_read(paths[0])  # "one" is now newer than "two"
+    tts._cache_write(paths[2], b"3" * 1000)
+
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+    assert tts._cache_bytes == 2000
+
+def test_cache_index_survives_restart(tts):
+    path = tts._cache_path("persisted", "en", "gtts", "mp3")
+    tts._cache_write(path, b"p" * 1000)
+
+    restarted = IRISTextToSpeech(cache_max_bytes=2500)
+    assert restarted._cache_read(path) == b"p" * 1000
+    assert restarted._cache_bytes == 1000
+
+@pytest.mark.asyncio
+async def test_cache_read_survives_eviction_by_another_worker(tts, monkeypatch):
+    path = tts._cache_path("shared", "en", "gtts", "mp3")
+    await tts._cache_put(path, b"s" * 1000)
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    # Another worker deletes the clip between our read and the LRU touch
+    monkeypatch.setattr("os.utime", evicted)
+    assert await tts._cache_get(path) == b"s" * 1000
+
+@pytest.mark.asyncio
+async def test_gtts_stream_uses_tld_and_settles_abandoned_fetches(tts, monkeypatch):
+    urls = []
+    monkeypatch.setattr("src.speech.tts._gtts_decode", lambda payload: payload.encode())
+
+    class SlowClient:
+        async def post(self, url, **kwargs):
+            urls.append(url)
+            if len(urls) > 1:
+                await asyncio.Event().wait()  # Later parts never answer
+            return httpx.Response(200, text="ID3 first", request=httpx.Request("POST", url))
+
+    tts.http_client = SlowClient()
+    tts.gtts_tld = "co.uk"
+    stream = tts._gtts_stream("A sentence long enough to need its own request. " * 3, "en")
+    assert await stream.__anext__() == b"ID3 first"
+    await stream.aclose()
+
+    assert len(urls) > 1 and all(url.startswith("https://translate.google.co.uk/") for url in urls)
+    # The abandoned fetches have finished, not just been asked to, and hold no sentence slots
+    assert tts._sentence_semaphore()._value == tts.max_sentence_concurrency
+
+def test_result_encodes_base64_lazily():
+    result = TTSResult({"success": True, "audio_bytes": b"RIFF audio"})
+    assert "audio_base64" not in result
+
+    # Plain dict.get doesn't encode; indexing does, once
+    assert result.get("audio_base64") is None
+    assert result["audio_base64"] == base64.b64encode(b"RIFF audio").decode("ascii")
+    assert result.get("audio_base64") is result["audio_base64"]
+
+def test_result_for_json_drops_raw_bytes():
+    payload = TTSResult({"success": True, "engine": "espeak", "audio_bytes": b"RIFF audio"}).for_json()
+
+    assert "audio_bytes" not in payload
+    assert base64.b64decode(payload["audio_base64"]) == b"RIFF audio"
+    assert TTSResult({"success": False, "error": "boom"}).for_json() == {"success": False, "error": "boom"}
+
+def test_supported_languages_are_read_only(tts):
+    languages = tts.get_supported_languages()
+
+    with pytest.raises(TypeError):
+        languages["festival"] = ("en", "fr")
+    assert IRISTextToSpeech().get_supported_languages()["festival"] == ("en",)
+
+# Large enough that GZipMiddleware would compress it if it were not audio
+FAKE_CLIP = b"RIFF fake clip" + bytes(2048)
+
+@pytest.fixture
+def fake_espeak():
+    """Route the espeak engine to a canned WAV clip"""
+    async def speak(text, language):
+        return {
+            "success": True,
+            "engine": "espeak",
+            "audio_format": "wav",
+            "audio_bytes": FAKE_CLIP,
+            "text": text,
+            "language": language,
+            "cached": False,
+            "duration_estimate": 1.25
+        }
+
+    original = iris_tts._dispatch[TTSEngine.ESPEAK]
+    iris_tts._dispatch[TTSEngine.ESPEAK] = speak
+    yield
+    iris_tts._dispatch[TTSEngine.ESPEAK] = original
+    iris_tts.engine = iris_tts.engine  # Re-resolve the cached handler
+
+def test_speak_returns_raw_audio_when_accepted(client, fake_espeak):
+    response = client.post(
+        "/speak",
+        json={"text": "raw bytes please", "language": "en", "engine": "espeak"},
+        headers={"Accept": "audio/*", "Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    assert "content-encoding" not in response.headers
+    assert response.headers["x-tts-engine"] == "espeak"
+    assert response.headers["x-tts-duration-estimate"] == "1.250"
+    assert response.content == FAKE_CLIP
+
+def test_speak_returns_base64_json_by_default(client, fake_espeak):
+    response = client.post("/speak", json={"text": "json please", "language": "en", "engine": "espeak"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert "audio_bytes" not in payload
+    assert base64.b64decode(payload["audio_base64"]) == FAKE_CLIP
+
+@pytest.mark.asyncio
+async def test_speak_stream_sends_first_chunk_without_gzip_buffering(test_app, monkeypatch):
+    first_sent = asyncio.Event()
+
+    async def stream(text, language):
+        yield b"RIFF first"
+        # Under gzip the first chunk would still be held back here
+        await asyncio.wait_for(first_sent.wait(), timeout=1.0)
+        yield b"RIFF rest"
+
+    monkeypatch.setitem(iris_tts._stream_dispatch, TTSEngine.ESPEAK, stream)
+    requests = [{"type": "http.request", "body": orjson.dumps(
+        {"text": "stream please", "language": "en", "engine": "espeak"}
+    ), "more_body": False}]
+    messages = []
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # No disconnect while the body streams
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_sent.set()
+
+    await test_app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/speak/stream", "raw_path": b"/speak/stream",
+        "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"), (b"accept-encoding", b"gzip")]
+    }, receive, send)
+
+    start = messages[0]
+    headers = dict(start["headers"])
+    assert start["status"] == 200
+    assert b"content-encoding" not in headers
+    assert [m["body"] for m in messages[1:] if m.get("body")] == [b"RIFF first", b"RIFF rest"]